@@ -0,0 +1,70 @@
+# Ingestion throughput of the same k6 report read as plain JSON, .json.gz and .json.zst
+# Usage: python benchmarks/bench_compressed.py [requests | path of a k6 JSON report]
+import os
+import sys
+import gzip
+import time
+import shutil
+import tempfile
+import orjson
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from k6_reports.engine import process_json_file
+
+# Metrics k6 writes for every HTTP request, besides the Metric lines
+REQUEST_METRICS = ['http_reqs', 'http_req_duration', 'http_req_blocked', 'http_req_connecting', 'http_req_tls_handshaking', 'http_req_sending',
+                   'http_req_waiting', 'http_req_receiving', 'http_req_failed']
+
+def make_report(path, requests):
+    # Synthetic k6 report with the Point lines of every request, one second of 1000 requests after another. k6 measures
+    # the durations in nanoseconds and writes them in ms, so they have at most 6 decimals.
+    rng = np.random.default_rng(0)
+    durations = np.round(rng.lognormal(3.5, 0.4, requests), 6)
+    tags = {'expected_response': 'true', 'group': '', 'method': 'GET', 'name': 'http://example.com/', 'proto': 'HTTP/1.1',
+            'scenario': 'default', 'status': '200', 'tls_version': '', 'url': 'http://example.com/'}
+    with open(path, 'wb') as f:
+        for i, duration in enumerate(durations.tolist()):
+            time_str = f'2024-10-01T10:{i // 60000 % 60:02d}:{i // 1000 % 60:02d}.{i % 1000:03d}000000-03:00'
+            for metric in REQUEST_METRICS:
+                value = 1 if metric == 'http_reqs' else 0 if metric == 'http_req_failed' else duration
+                f.write(orjson.dumps({'metric': metric, 'type': 'Point', 'data': {'time': time_str, 'value': value, 'tags': tags}}) + b'\n')
+
+def same_stats(stats, other_stats):
+    # The latency sketch (last item) adds up its sum block by block, so its sum is only equal up to rounding when
+    # the blocks of the two readers end at different lines
+    *stats, sketch = stats
+    *other_stats, other_sketch = other_stats
+    same_sketch = all(np.isclose(value, other_sketch[key], rtol=1e-12) if key == 'sum' else np.array_equal(value, other_sketch[key]) for key, value in sketch.items())
+    return same_sketch and all(np.array_equal(a, b) if isinstance(a, np.ndarray) else a.equals(b) if hasattr(a, 'equals') else a == b for a, b in zip(stats, other_stats))
+
+def timed_ingestion(path):
+    start = time.perf_counter()
+    stats = process_json_file(path)
+    return time.perf_counter() - start, stats
+
+def main():
+    import zstandard
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'k6-report.json')
+        if len(sys.argv) > 1 and os.path.exists(sys.argv[1]):
+            shutil.copyfile(sys.argv[1], path)
+        else:
+            make_report(path, int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
+        with open(path, 'rb') as source, gzip.open(path + '.gz', 'wb', compresslevel=6) as target:
+            shutil.copyfileobj(source, target, 16 * 1024 * 1024)
+        with open(path, 'rb') as source, open(path + '.zst', 'wb') as target:
+            zstandard.ZstdCompressor(level=3, threads=-1).copy_stream(source, target)
+
+        size = os.path.getsize(path)
+        print(f"{size / 1e6:.0f} MB of k6 JSON")
+        plain_stats = None
+        for suffix in ('', '.gz', '.zst'):
+            seconds, stats = timed_ingestion(path + suffix)
+            plain_stats = stats if plain_stats is None else plain_stats
+            print(f"{'json' + suffix:9} {os.path.getsize(path + suffix) / 1e6:7.0f} MB on disk  {seconds:6.2f} s  {size / 1e6 / seconds:6.0f} MB/s of JSON  same statistics: {same_stats(plain_stats, stats)}")
+
+if __name__ == "__main__":
+    main()
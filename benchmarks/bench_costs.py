@@ -0,0 +1,68 @@
+# Evaluation time of the breakeven cost curves over a growing number of RPS points: the scalar per-point model of the
+# original breakeven.py scripts (if/elif tiers, float32 requests) against the array functions of k6_reports.costs.
+# Then the time to find the breakevens of one pair of costs with breakeven_crossings, and what fsolve from 250 finds.
+# Usage: python benchmarks/bench_costs.py [largest number of points]
+import os
+import sys
+import time
+import numpy as np
+from scipy.optimize import fsolve
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from k6_reports import costs
+
+MEMORY_MB = 1536
+EXECUTION_TIME_MS = 194
+INSTANCE_MONTHLY_COST = 15.18
+
+def scalar_lambda_cost(rps):
+    monthly_requests = np.float32(rps) * np.float32(costs.SECONDS_IN_MONTH)
+    gb_seconds = monthly_requests * EXECUTION_TIME_MS / 1000 * MEMORY_MB / 1024
+    (tier_1_limit, tier_1), (tier_3_limit, tier_2), (_, tier_3) = costs.LAMBDA_GB_SECOND_TIERS
+    if gb_seconds <= tier_1_limit:
+        compute_cost = gb_seconds * tier_1
+    elif gb_seconds <= tier_3_limit:
+        compute_cost = tier_1_limit * tier_1 + (gb_seconds - tier_1_limit) * tier_2
+    else:
+        compute_cost = tier_1_limit * tier_1 + (tier_3_limit - tier_1_limit) * tier_2 + (gb_seconds - tier_3_limit) * tier_3
+    return compute_cost + monthly_requests * costs.LAMBDA_REQUEST_COST_PER_MILLION / 1_000_000
+
+def scalar_ec2_ha_cost(rps):
+    instances = max(2, ((rps - 0.01) // 10 + 1) * 2)
+    lcus = max(1, rps / 25, rps / 3000, 0)
+    return INSTANCE_MONTHLY_COST * instances + costs.ALB_FIXED_MONTHLY_COST + lcus * costs.LCU_COST_PER_HOUR * costs.HOURS_PER_MONTH
+
+def main():
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    for points in (largest // 100, largest // 10, largest):
+        # Up to 100k RPS, so the GB-seconds cross every tier
+        rps_values = np.linspace(0, 100000, points)
+
+        start = time.perf_counter()
+        scalar = np.array([scalar_lambda_cost(rps) for rps in rps_values]), np.array([scalar_ec2_ha_cost(rps) for rps in rps_values])
+        scalar_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        vectorized = costs.lambda_cost(rps_values, MEMORY_MB, EXECUTION_TIME_MS), costs.ec2_ha_cost(rps_values, INSTANCE_MONTHLY_COST)
+        vectorized_time = time.perf_counter() - start
+
+        error = max(np.max(np.abs(a - b) / np.maximum(1, b)) for a, b in zip(vectorized, scalar))
+        print(f"{points:>9} points: scalar {scalar_time:8.3f} s, vectorized {vectorized_time:8.4f} s ({scalar_time / vectorized_time:6.0f}x), max relative difference {error:.1e}")
+
+    # Cheaper Lambda, so the EC2 steps cross it several times
+    lambda_cost = lambda rps: costs.lambda_cost(rps, 256, 40)
+    ec2_cost = lambda rps: costs.ec2_ha_cost(rps, 3.0)
+    breakpoints = np.concatenate([costs.lambda_breakpoints(256, 40), costs.alb_breakpoints(), costs.instance_breakpoints(500)])
+    start = time.perf_counter()
+    for _ in range(1000):
+        crossings, _ = costs.breakeven_crossings(lambda_cost, ec2_cost, breakpoints, 0, 500)
+    solver_time = (time.perf_counter() - start) / 1000
+    crossings = crossings[~np.isnan(crossings)]
+    print(f"breakeven_crossings: {len(crossings)} crossings in {solver_time * 1e6:.0f} us ({len(breakpoints)} breakpoints): {', '.join(f'{rps:.2f}' for rps in crossings)}")
+    start = time.perf_counter()
+    root = fsolve(lambda x: lambda_cost(x) - ec2_cost(x), 250)[0]
+    print(f"fsolve from 250: {root:.2f} in {(time.perf_counter() - start) * 1e6:.0f} us")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+# Rendering time of the density plots drawn from latency sketches, compared with the downsampled scatter, as the
+# number of samples per load level grows. The density plots only read bucket counts, so their time stays flat.
+# Usage: python benchmarks/bench_density.py [load levels] [largest samples per level]
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from k6_reports.sketch import LatencySketch
+from k6_reports.datasets import write_samples
+from k6_reports.plots import DENSITY_RENDERERS, draw_latency_scatter
+
+def timed(function, **kwargs):
+    start = time.perf_counter()
+    function(**kwargs)
+    return time.perf_counter() - start
+
+def main():
+    levels = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    largest = int(sys.argv[2]) if len(sys.argv) > 2 else 10000000
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as folder:
+        for samples in (largest // 100, largest // 10, largest):
+            series, sketch_dicts = [], []
+            for level in range(levels):
+                values = rng.lognormal(3.5 + level * 0.05, 0.4, samples)
+                path = os.path.join(folder, f'level-{level}.arrow')
+                write_samples(path, values)
+                series.append(((level + 1) * 10, [path]))
+                sketch = LatencySketch()
+                sketch.add(values)
+                sketch_dicts.append(sketch.to_dict())
+            labels = [str(rps) for rps, paths in series]
+            times = {kind: timed(draw, path=os.path.join(folder, f'{kind}.png'), title='bench', level_label='RPS', levels=labels, sketch_dicts=sketch_dicts)
+                     for kind, draw in DENSITY_RENDERERS.items()}
+            times['scatter'] = timed(draw_latency_scatter, path=os.path.join(folder, 'scatter.png'), architecture='bench', series=series)
+            print(f"{levels} levels x {samples} samples: " + ', '.join(f'{kind} {seconds:.2f} s' for kind, seconds in times.items()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Ingestion time of the same k6 report with the original parser of the scripts (orjson on every line, durations in a
+# list) against process_json_file with the block reader and with --mmap, checking that they give the same statistics
+# Usage: python benchmarks/bench_ingestion.py [requests | path of a k6 JSON report]
+import os
+import sys
+import time
+import tempfile
+import orjson
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_compressed import make_report
+from k6_reports.engine import process_json_file
+
+def line_by_line(json_path):
+    # process_json_file of the original k6-reports-to-xlsx-with-plots.py scripts
+    response_times = []
+    http_codes_200 = 0
+    http_codes_fail = 0
+    with open(json_path, 'r') as f:
+        for line in f:
+            entry = orjson.loads(line)
+            if entry['type'] == 'Point':
+                if entry['metric'] == 'http_req_duration':
+                    response_times.append(entry['data']['value'])
+                elif entry['metric'] == 'http_req_failed':
+                    if entry['data']['value'] == 0:
+                        http_codes_200 += 1
+                    else:
+                        http_codes_fail += 1
+    return [len(response_times), np.min(response_times), np.max(response_times), np.mean(response_times), np.median(response_times),
+            np.percentile(response_times, 90), np.percentile(response_times, 99), http_codes_200, http_codes_fail]
+
+def best_times(functions, path, repeat=7):
+    # Best time and statistics of every function, run in turns so that a slower period of the machine does not only
+    # fall on one of them
+    seconds = {label: [] for label in functions}
+    stats = {}
+    for _ in range(repeat):
+        for label, function in functions.items():
+            start = time.perf_counter()
+            stats[label] = function(path)[:9]
+            seconds[label].append(time.perf_counter() - start)
+    return {label: (min(seconds[label]), stats[label]) for label in functions}
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        if len(sys.argv) > 1 and os.path.exists(sys.argv[1]):
+            path = sys.argv[1]
+        else:
+            path = os.path.join(folder, 'k6-report.json')
+            make_report(path, int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
+
+        print(f"{os.path.getsize(path) / 1e6:.0f} MB of k6 JSON")
+        results = best_times({
+            'line by line': line_by_line,
+            'blocks': process_json_file,
+            'mmap': lambda json_path: process_json_file(json_path, mapped=True),
+        }, path)
+        baseline_seconds, baseline_stats = results.pop('line by line')
+        print(f"line by line  {baseline_seconds:6.2f} s")
+        for label, (seconds, stats) in results.items():
+            print(f"{label:13} {seconds:6.2f} s  ({baseline_seconds / seconds:.1f}x)  same statistics: {stats == baseline_stats}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# Ingestion time of the same k6 report with the block reader (blocks copied into a buffer) and the memory-mapped
+# reader (zero-copy views of the file), checking that both give the same statistics
+# Usage: python benchmarks/bench_mapped.py [requests | path of a k6 JSON report]
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_compressed import make_report, same_stats
+from k6_reports.engine import METRICS, process_json_file
+
+def timed_ingestion(path, **kwargs):
+    start = time.perf_counter()
+    stats = process_json_file(path, **kwargs)
+    return time.perf_counter() - start, stats
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        if len(sys.argv) > 1 and os.path.exists(sys.argv[1]):
+            path = sys.argv[1]
+        else:
+            path = os.path.join(folder, 'k6-report.json')
+            make_report(path, int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
+
+        print(f"{os.path.getsize(path) / 1e6:.0f} MB of k6 JSON")
+        for label, kwargs in [('default metrics', {}), ('--timeline 1', {'timeline_seconds': 1}), ('every metric', {'metrics': dict(METRICS)})]:
+            block_seconds, stats = timed_ingestion(path, **kwargs)
+            mapped_seconds, mapped_stats = timed_ingestion(path, mapped=True, **kwargs)
+            print(f"{label:16} blocks {block_seconds:6.2f} s  mmap {mapped_seconds:6.2f} s  ({block_seconds / mapped_seconds:.1f}x)  same statistics: {same_stats(stats, mapped_stats)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Compares the previous per-row latency scatter (every sample of every report, one figure after another)
+# with the downsampled scatters rendered by render_figures in a pool of worker processes
+# Usage: python benchmarks/bench_plots.py [architectures] [reports per architecture] [samples per report] [jobs]
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from k6_reports.datasets import write_samples, load_samples
+from k6_reports.plots import render_figures, draw_latency_scatter
+
+def make_reports(folder, architectures, reports, samples):
+    rng = np.random.default_rng(0)
+    rows = []
+    for a in range(architectures):
+        for i in range(reports):
+            path = os.path.join(folder, f'arch-{a}', f'report-{i}.arrow')
+            write_samples(path, rng.lognormal(3.5, 0.4, samples))
+            rows.append((f'arch-{a}', (i % 10 + 1) * 10, path))
+    return rows
+
+def legacy_scatter(rows, folder):
+    # The previous main(): one scatter call per report with a Python list of x values, figures drawn sequentially
+    for architecture in sorted({row[0] for row in rows}):
+        fig, ax = plt.subplots(figsize=(10, 10))
+        for row_architecture, rps, path in rows:
+            if row_architecture == architecture:
+                response_times = load_samples(path)
+                ax.scatter([rps] * len(response_times), response_times, label=f"{architecture} ({rps} RPS)", alpha=0.6)
+        ax.legend(loc='center left', bbox_to_anchor=(1, 0.5))
+        fig.savefig(os.path.join(folder, f'legacy-{architecture}.png'), bbox_inches='tight')
+        plt.close(fig)
+
+def main():
+    architectures = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    reports = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    samples = int(sys.argv[3]) if len(sys.argv) > 3 else 100000
+    jobs = int(sys.argv[4]) if len(sys.argv) > 4 else os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as folder:
+        rows = make_reports(folder, architectures, reports, samples)
+
+        start = time.perf_counter()
+        legacy_scatter(rows, folder)
+        legacy_seconds = time.perf_counter() - start
+
+        figures = []
+        for architecture in sorted({row[0] for row in rows}):
+            levels = sorted({rps for row_architecture, rps, path in rows if row_architecture == architecture})
+            series = [(rps, [path for row_architecture, row_rps, path in rows if row_architecture == architecture and row_rps == rps]) for rps in levels]
+            figures.append((draw_latency_scatter, {'path': os.path.join(folder, f'{architecture}.png'), 'architecture': architecture, 'series': series}))
+        start = time.perf_counter()
+        render_figures(figures, jobs)
+        pooled_seconds = time.perf_counter() - start
+
+    print(f"{architectures} figures x {reports} reports x {samples} samples")
+    print(f"per-row scatter, sequential:     {legacy_seconds:.2f} s")
+    print(f"downsampled, {jobs} worker processes: {pooled_seconds:.2f} s ({legacy_seconds / pooled_seconds:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
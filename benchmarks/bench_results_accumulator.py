@@ -0,0 +1,66 @@
+# Compares the old temp-CSV + pd.concat accumulation of results_df with the in-memory build_results_df
+# Usage: python benchmarks/bench_results_accumulator.py [reports] [samples per report]
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from k6_reports.pipeline import build_results_df
+
+COLUMNS = ['Architecture', 'Test Run', 'File', 'RPS (Requests per Second)', 'Request Count', 'Min Response Time', 'Max Response Time', 'Mean Response Time',
+           'Median Response Time', 'P90 Response Time', 'P99 Response Time',
+           'HTTP Codes 200', 'HTTP Codes Fail', 'Response Times']
+COLUMN_TYPES = {'RPS (Requests per Second)': 'int64', 'Request Count': 'Int64', 'Min Response Time': 'float64', 'Max Response Time': 'float64',
+                'Mean Response Time': 'float64', 'Median Response Time': 'float64', 'P90 Response Time': 'float64', 'P99 Response Time': 'float64',
+                'HTTP Codes 200': 'Int64', 'HTTP Codes Fail': 'Int64'}
+
+def make_rows(reports, samples):
+    rng = np.random.default_rng(0)
+    rows = []
+    for i in range(reports):
+        response_times = rng.lognormal(3.5, 0.4, samples)
+        rows.append(['lambda' if i % 2 else 'monolithic', f'run-{i % 4 + 1}', f'report-{i}.json', (i % 10 + 1) * 10, samples,
+                     response_times.min(), response_times.max(), response_times.mean(), np.median(response_times),
+                     np.percentile(response_times, 90), np.percentile(response_times, 99), samples, 0, response_times])
+    return rows
+
+def legacy_accumulate(rows, folder):
+    # The previous main(): one single-row CSV per report, then read back and concatenated one at a time
+    results_df = pd.DataFrame(columns=COLUMNS)
+    temp_csvs = []
+    for i, row in enumerate(rows):
+        row = row[:-1] + [row[-1].tolist()]
+        temp_csv = os.path.join(folder, f'report-{i}.json.csv')
+        pd.Series(row, index=COLUMNS).to_frame().T.to_csv(temp_csv, index=False)
+        temp_csvs.append(temp_csv)
+    for temp_csv in temp_csvs:
+        temp_df = pd.read_csv(temp_csv)
+        results_df = pd.concat([results_df, temp_df], ignore_index=True)
+        os.remove(temp_csv)
+    return results_df
+
+def main():
+    reports = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    rows = make_rows(reports, samples)
+
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        legacy_df = legacy_accumulate(rows, folder)
+        legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results_df = build_results_df(rows, COLUMNS, COLUMN_TYPES)
+    in_memory_seconds = time.perf_counter() - start
+
+    assert len(legacy_df) == len(results_df) == reports
+    print(f"{reports} reports x {samples} samples")
+    print(f"temp CSV + pd.concat: {legacy_seconds:.3f} s")
+    print(f"build_results_df:     {in_memory_seconds:.3f} s ({legacy_seconds / in_memory_seconds:.0f}x faster)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+# Processing of the k6 JSON reports of every benchmark into results.xlsx, Arrow datasets and plots.
+# The folder layout of each chapter is described by a profile in layouts.LAYOUTS, run `k6-reports --help` for the options.
@@ -0,0 +1,82 @@
+import os
+import numpy as np
+import pandas as pd
+
+from . import costs
+from .sketch import LatencySketch
+from .datasets import load_samples
+
+# Monthly Lambda cost from the measured duration distribution of the Lambda reports instead of a single execution time.
+# Lambda bills every request rounded up to BILLING_GRANULARITY_MS, so the expected cost follows the mean of the rounded
+# durations, tail included. http_req_duration is measured by k6 on the client, so overhead_ms (network, API Gateway,
+# Function URL) can be subtracted from every duration before rounding.
+BILLING_GRANULARITY_MS = 1
+LAMBDA_COST_SHEET = 'Lambda Cost'
+
+def billed_durations(durations_ms, overhead_ms=0, granularity_ms=BILLING_GRANULARITY_MS):
+    # Billed duration of every request, never less than one billing unit
+    return np.maximum(np.ceil((np.asarray(durations_ms, dtype=np.float64) - overhead_ms) / granularity_ms), 1) * granularity_ms
+
+def billed_histogram(group, folder_path, overhead_ms=0, granularity_ms=BILLING_GRANULARITY_MS):
+    # (billed durations, request counts) of the reports of group, from their samples when they were kept and from
+    # the buckets of their sketches otherwise (within the sketch error)
+    values, weights = [], []
+    for sample_path, sketch_dict in zip(group['Samples File'], group['Latency Sketch']):
+        if isinstance(sample_path, str):
+            values.append(billed_durations(load_samples(os.path.join(folder_path, sample_path)), overhead_ms, granularity_ms))
+            weights.append(np.ones(len(values[-1]), dtype=np.int64))
+        elif sketch_dict is not None and sketch_dict['count']:
+            sketch = LatencySketch.from_dict(sketch_dict)
+            indexes = np.flatnonzero(sketch.counts)
+            bucket_values = np.clip(sketch.bucket_values(indexes), sketch.min, sketch.max)
+            values.append(billed_durations(bucket_values, overhead_ms, granularity_ms))
+            weights.append(sketch.counts[indexes])
+    if not values:
+        return np.array([]), np.array([], dtype=np.int64)
+    billed, inverse = np.unique(np.concatenate(values), return_inverse=True)
+    return billed, np.bincount(inverse, weights=np.concatenate(weights)).astype(np.int64)
+
+def histogram_quantile(values, counts, q):
+    cumulative = np.cumsum(counts)
+    return values[np.searchsorted(cumulative, q * (cumulative[-1] - 1), side='right')]
+
+def lambda_cost_df(results_df, folder_path, memory_mb, architecture='lambda', overhead_ms=0, granularity_ms=BILLING_GRANULARITY_MS):
+    # Monthly cost of a constant load at every RPS level of the architecture reports, from the billed durations of all
+    # the requests of its runs, next to the cost of the median duration alone
+    rows = []
+    reports_df = results_df[results_df['Architecture'] == architecture]
+    for rps, group in reports_df.groupby('RPS (Requests per Second)'):
+        billed, counts = billed_histogram(group, folder_path, overhead_ms, granularity_ms)
+        if not len(billed):
+            continue
+        sketch_dicts = [data for data in group['Latency Sketch'] if data is not None and data['count']]
+        mean_billed = float(billed @ counts / counts.sum())
+        median_billed = float(histogram_quantile(billed, counts, 0.5))
+        p99_billed = float(histogram_quantile(billed, counts, 0.99))
+        tail = billed > p99_billed
+        rows.append({
+            'RPS (Requests per Second)': rps,
+            'Runs': len(group),
+            'Requests': int(counts.sum()),
+            'Mean Duration (ms)': sum(data['sum'] for data in sketch_dicts) / sum(data['count'] for data in sketch_dicts),
+            'Mean Billed Duration (ms)': mean_billed,
+            'Median Billed Duration (ms)': median_billed,
+            'P99 Billed Duration (ms)': p99_billed,
+            'Billed Share above P99': float(billed[tail] @ counts[tail] / (billed @ counts)),
+            'Monthly Cost': float(costs.lambda_cost(rps, memory_mb, mean_billed)),
+            'Monthly Cost (Median Duration)': float(costs.lambda_cost(rps, memory_mb, median_billed)),
+        })
+    return pd.DataFrame(rows)
+
+def measured_billed_duration_ms(results_excel_path):
+    # Mean billed duration over every request of the Lambda Cost sheet written by k6-reports --lambda-memory,
+    # None when there is no such sheet
+    if not os.path.exists(results_excel_path):
+        return None
+    try:
+        cost_df = pd.read_excel(results_excel_path, sheet_name=LAMBDA_COST_SHEET)
+    except ValueError:
+        return None
+    if cost_df.empty:
+        return None
+    return float((cost_df['Mean Billed Duration (ms)'] * cost_df['Requests']).sum() / cost_df['Requests'].sum())
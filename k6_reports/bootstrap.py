@@ -0,0 +1,102 @@
+import itertools
+import numpy as np
+import pandas as pd
+
+from .sketch import LatencySketch
+
+# Bootstrap of the runs of every architecture + load level, computed from the latency sketches of the reports so it
+# never reads the samples. Each resample draws the runs with replacement and then the requests of the drawn runs
+# from their sketch buckets, all resamples of a group at once as NumPy arrays.
+BOOTSTRAP_RESAMPLES = 2000
+BOOTSTRAP_CONFIDENCE = 0.95
+
+# Statistics with a confidence interval, None is the mean and any other value a quantile
+BOOTSTRAP_STATS = {'Mean': None, 'Median': 0.5, 'P99': 0.99}
+
+def group_counts(sketch_dicts):
+    # (runs, buckets) counts of the sketches of a group over the range of buckets any of them uses, with the
+    # value of each of those buckets
+    sketches = [LatencySketch.from_dict(data) for data in sketch_dicts]
+    counts = np.array([sketch.counts for sketch in sketches])
+    used = np.flatnonzero(counts.sum(axis=0))
+    counts = counts[:, used[0]:used[-1] + 1]
+    return counts, sketches[0].bucket_values(np.arange(used[0], used[-1] + 1))
+
+def resample_counts(counts, resamples, rng):
+    # One pooled histogram per resample: the runs are drawn with replacement, then as many requests as the drawn
+    # runs have are drawn from their pooled buckets
+    runs = len(counts)
+    draws = rng.integers(runs, size=(resamples, runs))
+    weights = (draws[:, :, np.newaxis] == np.arange(runs)).sum(axis=1)  # Times each run was drawn
+    pooled = weights @ counts
+    totals = pooled.sum(axis=1)
+    return rng.multinomial(totals, pooled / totals[:, np.newaxis])
+
+def histogram_stat(counts, values, q):
+    # Mean (q is None) or quantile q of every row of a (rows, buckets) histogram, with the rank rule of LatencySketch.quantile
+    if q is None:
+        return counts @ values / counts.sum(axis=1)
+    cumulative = np.cumsum(counts, axis=1)
+    ranks = q * (cumulative[:, -1] - 1)
+    return values[(cumulative > ranks[:, np.newaxis]).argmax(axis=1)]
+
+def bootstrap_group(sketch_dicts, resamples, rng):
+    # Estimate and resampled values of every BOOTSTRAP_STATS statistic for the runs of one group
+    counts, values = group_counts(sketch_dicts)
+    replicates = resample_counts(counts, resamples, rng)
+    pooled = counts.sum(axis=0, keepdims=True)
+    low = min(data['min'] for data in sketch_dicts if data['count'])
+    high = max(data['max'] for data in sketch_dicts if data['count'])
+    results = {}
+    for stat, q in BOOTSTRAP_STATS.items():
+        estimate = histogram_stat(pooled, values, q)[0]
+        resampled = histogram_stat(replicates, values, q)
+        if q is None:
+            # The bucket values shift the mean by up to the sketch error, the resamples are centered on the exact mean
+            exact = sum(data['sum'] for data in sketch_dicts) / sum(data['count'] for data in sketch_dicts)
+            resampled += exact - estimate
+            estimate = exact
+        results[stat] = (float(np.clip(estimate, low, high)), np.clip(resampled, low, high))
+    return results
+
+def bootstrap_intervals(results_df, group_columns, compare_column, resamples=BOOTSTRAP_RESAMPLES, confidence=BOOTSTRAP_CONFIDENCE, seed=0):
+    # Confidence intervals of BOOTSTRAP_STATS for every group of runs (group_columns), and the difference between every
+    # pair of compare_column values (e.g. lambda vs monolithic) at the same level of the other group columns, with the
+    # two-sided bootstrap p-value of the difference being 0
+    rng = np.random.default_rng(seed)
+    alpha = (1 - confidence) / 2
+    reports_df = results_df.dropna(subset=['Latency Sketch'])
+    reports_df = reports_df[reports_df['Latency Sketch'].map(lambda data: data['count'] > 0)]
+
+    rows = []
+    replicates = {}
+    for key, group in reports_df.groupby(group_columns):
+        stats = bootstrap_group(group['Latency Sketch'].tolist(), resamples, rng)
+        replicates[key] = stats
+        row = dict(zip(group_columns, key))
+        row['Runs'] = len(group)
+        row['Requests'] = int(sum(data['count'] for data in group['Latency Sketch']))
+        for stat, (estimate, resampled) in stats.items():
+            row[f'{stat} Response Time'] = estimate
+            row[f'{stat} CI Low'], row[f'{stat} CI High'] = np.quantile(resampled, [alpha, 1 - alpha])
+        rows.append(row)
+    intervals_df = pd.DataFrame(rows)
+
+    rows = []
+    level_columns = [column for column in group_columns if column != compare_column]
+    position = group_columns.index(compare_column)
+    levels = {}
+    for key in replicates:
+        levels.setdefault(key[:position] + key[position + 1:], []).append(key)
+    for level, keys in levels.items():
+        for first, second in itertools.combinations(sorted(keys, key=lambda key: str(key[position])), 2):
+            for stat in BOOTSTRAP_STATS:
+                difference = replicates[first][stat][1] - replicates[second][stat][1]
+                p_value = min(1.0, 2 * min(np.mean(difference <= 0), np.mean(difference >= 0)))
+                rows.append({**dict(zip(level_columns, level)), 'Statistic': f'{stat} Response Time',
+                             f'{compare_column} A': first[position], f'{compare_column} B': second[position],
+                             'A': replicates[first][stat][0], 'B': replicates[second][stat][0],
+                             'Difference (A - B)': replicates[first][stat][0] - replicates[second][stat][0],
+                             'CI Low': np.quantile(difference, alpha), 'CI High': np.quantile(difference, 1 - alpha),
+                             'p-value': p_value, 'Significant': p_value < 1 - confidence})
+    return intervals_df, pd.DataFrame(rows)
@@ -0,0 +1,333 @@
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+from .engine import METRICS, DEFAULT_METRICS, METRIC_STATS
+from .sketch import SKETCH_RELATIVE_ERROR
+from .layouts import LAYOUTS, key_columns
+from .bootstrap import BOOTSTRAP_CONFIDENCE, bootstrap_intervals
+from .billing import LAMBDA_COST_SHEET, lambda_cost_df, measured_billed_duration_ms
+from .sweep import INSTANCE_TYPES, PRICING, sweep_breakevens, sweep_table, plot_sweep
+from .traffic import (SCALE_OUT_DELAY_SECONDS, SCALE_IN_COOLDOWN_SECONDS, diurnal_profile, add_bursts, series_profile, timeline_profile,
+                      simulation_table, draw_traffic_simulation)
+from .plots import DENSITY_RENDERERS, PLOT_CACHE_FILE, render_figures
+from .store import GROUP_COLUMNS, update_store, query_store
+from .discovery import DEFAULT_INCLUDE, DEFAULT_EXCLUDE, MANIFEST_FILE, find_reports, manifest_reports
+from .pipeline import CACHE_FILE, result_columns, result_column_types, process_files_cached, build_results_df, build_tag_groups_df
+
+def parse_metrics(value):
+    # Parse the --metrics argument: a comma separated list of names from METRICS or name:kind pairs
+    metrics = dict(DEFAULT_METRICS)
+    for item in filter(None, value.split(',')):
+        name, _, kind = item.strip().partition(':')
+        kind = kind or METRICS.get(name)
+        if kind not in METRIC_STATS:
+            raise argparse.ArgumentTypeError(f"Unknown metric '{item}', use one of {', '.join(METRICS)} or name:kind with kind in {', '.join(METRIC_STATS)}")
+        metrics[name] = kind
+    return metrics
+
+def parse_trim(value):
+    # Parse the --trim argument: auto or LEAD[,TRAIL] seconds cut from the start and the end of every report
+    if value == 'auto':
+        return value
+    try:
+        seconds = [float(item) for item in value.split(',')]
+    except ValueError:
+        seconds = []
+    if len(seconds) not in (1, 2) or min(seconds) < 0:
+        raise argparse.ArgumentTypeError(f"Invalid trim '{value}', use auto or LEAD[,TRAIL] in seconds")
+    return seconds + [0.0] * (2 - len(seconds))
+
+def parse_reservoir(value):
+    # Parse the --reservoir argument: SIZE, or SIZE,SECONDS to stratify the sample by time windows of SECONDS
+    try:
+        parts = value.split(',')
+        size = int(parts[0])
+        seconds = float(parts[1]) if len(parts) == 2 else None
+    except ValueError:
+        size, parts = 0, []
+    if len(parts) not in (1, 2) or size <= 0 or (seconds is not None and seconds <= 0):
+        raise argparse.ArgumentTypeError(f"Invalid reservoir '{value}', use SIZE or SIZE,SECONDS")
+    return [size, seconds]
+
+def parse_tag_keys(value):
+    # Parse the --group-by-tags argument: a comma separated list of k6 tag keys (status, name, url, method, scenario, ...)
+    return [key.strip() for key in value.split(',') if key.strip()]
+
+def parse_globs(value):
+    # Parse the --include/--exclude arguments: a comma separated list of globs
+    return [glob.strip() for glob in value.split(',') if glob.strip()]
+
+def parse_density(value):
+    # Parse the --density argument: a comma separated list of DENSITY_RENDERERS
+    kinds = [kind.strip() for kind in value.split(',') if kind.strip()]
+    unknown = [kind for kind in kinds if kind not in DENSITY_RENDERERS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown density plot {', '.join(unknown)}, use {', '.join(DENSITY_RENDERERS)}")
+    return kinds
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Process k6 JSON reports into results.xlsx and plots')
+    parser.add_argument('folder', nargs='?', default=os.getcwd(), help='Folder searched for k6 reports, where results.xlsx and the images are written (default: the current folder)')
+    parser.add_argument('--layout', choices=LAYOUTS, default='architecture-rps', help='Folder layout of the reports, which maps their paths to metadata columns (default: %(default)s)')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of worker processes used to process the JSON files (0 uses every core)')
+    parser.add_argument('--include', type=parse_globs, default=DEFAULT_INCLUDE, metavar='GLOBS', help=f'Comma separated file name globs of the k6 reports, globs with a / match the path relative to the folder (default: {",".join(DEFAULT_INCLUDE)})')
+    parser.add_argument('--exclude', type=parse_globs, default=DEFAULT_EXCLUDE, metavar='GLOBS', help=f'Comma separated globs of the files and directories left out, excluded directories are never listed (default: {",".join(DEFAULT_EXCLUDE)})')
+    parser.add_argument('--from-manifest', action='store_true', help=f'Read the reports from the {MANIFEST_FILE} written by the last run instead of searching the folder again')
+    parser.add_argument('--no-cache', action='store_true', help=f'Parse every JSON file and draw every figure again instead of reusing {CACHE_FILE} and {PLOT_CACHE_FILE}')
+    parser.add_argument('--mmap', action='store_true', help='Memory-map the uncompressed reports instead of copying them block by block into a buffer (fastest on local disks, same results, not used with --group-by-tags)')
+    parser.add_argument('--sketch', action='store_true', help='Keep only a quantile sketch per report instead of every sample (constant memory, approximate percentiles, no samples files)')
+    parser.add_argument('--reservoir', type=parse_reservoir, metavar='SIZE[,SECONDS]', help='Keep a uniform sample of SIZE durations per report for the latency scatter plots, stratified by time windows of SECONDS when given. With --sketch the scatter plots no longer need the samples files')
+    parser.add_argument('--sketch-error', type=float, default=SKETCH_RELATIVE_ERROR, help='Relative error of the sketch quantiles (default: %(default)s)')
+    parser.add_argument('--timeline', type=float, metavar='SECONDS', help='Also write a per-window timeline (requests, achieved RPS, P50/P99, failure rate) of every report, using windows of SECONDS')
+    parser.add_argument('--metrics', type=parse_metrics, default=dict(DEFAULT_METRICS), help=f'Comma separated k6 metrics to collect on top of http_req_duration and http_req_failed, from {", ".join(METRICS)} or as name:kind for custom metrics (kinds: {", ".join(METRIC_STATS)})')
+    parser.add_argument('--group-by-tags', type=parse_tag_keys, metavar='TAGS', help='Comma separated k6 tag keys (e.g. status,name,scenario,expected_response) used to split the request counts, failures and latency percentiles of every report into a Tag Groups sheet')
+    parser.add_argument('--trim', type=parse_trim, metavar='LEAD[,TRAIL]|auto', help='Also report statistics without the first LEAD and last TRAIL seconds of every report, or only over the steady state detected from the achieved RPS with auto (percentiles within the sketch error)')
+    parser.add_argument('--density', type=parse_density, default=[], metavar='KINDS', help=f'Comma separated latency density plots drawn per architecture from the sketches, independent of the number of samples ({", ".join(DENSITY_RENDERERS)})')
+    parser.add_argument('--bootstrap', type=int, metavar='RESAMPLES', help='Also write bootstrap confidence intervals of the mean, median and P99 of every architecture and load level across its runs, and the significance of the differences between architectures, using RESAMPLES resamples of the sketches (e.g. 2000)')
+    parser.add_argument('--confidence', type=float, default=BOOTSTRAP_CONFIDENCE, help='Confidence level of the --bootstrap intervals (default: %(default)s)')
+    parser.add_argument('--lambda-memory', type=float, metavar='MB', help=f'Also write a {LAMBDA_COST_SHEET} sheet with the monthly cost of every RPS level of the Lambda reports for a function of MB, from the measured durations of all their requests rounded up to 1 ms as Lambda bills them (architecture-rps layout). The breakeven.py scripts use its mean billed duration')
+    parser.add_argument('--lambda-architecture', default='lambda', help='Architecture of the Lambda reports for --lambda-memory (default: %(default)s)')
+    parser.add_argument('--billing-overhead', type=float, default=0, metavar='MS', help='Milliseconds of every k6 duration spent outside the function (network, API Gateway), subtracted before rounding (default: %(default)s)')
+    parser.add_argument('--store', metavar='PATH', help='SQLite results store shared by every scenario folder (e.g. k6-results.sqlite at the root of the repository), the reports of this folder replace the ones it already has')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    layout = LAYOUTS[args.layout]
+    jobs = args.jobs or os.cpu_count()
+    options = {'layout': args.layout, 'sketch': args.sketch, 'sketch_error': args.sketch_error, 'timeline': args.timeline, 'metrics': args.metrics,
+               'tags': args.group_by_tags, 'trim': args.trim, 'reservoir': args.reservoir}
+    folder_path = os.path.abspath(args.folder)
+    results_excel_path = os.path.join(folder_path, 'results.xlsx')
+
+    if args.from_manifest:
+        json_files = manifest_reports(folder_path, args.layout, args.include, args.exclude)
+    else:
+        json_files = find_reports(folder_path, args.layout, args.include, args.exclude)
+
+    # Without any report left on disk, the existing Excel file is only used for plotting
+    if not json_files and os.path.exists(results_excel_path):
+        print(f"No k6 reports found. Proceeding with plotting from {results_excel_path}.")
+        results_df = pd.read_excel(results_excel_path)
+    else:
+        rows = process_files_cached(json_files, folder_path, jobs, options, use_cache=not args.no_cache, mapped=args.mmap)
+        results_df = build_results_df(rows, result_columns(options), result_column_types(options))
+        if layout['summarize'] is not None:
+            results_df = layout['summarize'](results_df)
+
+        # With --group-by-tags the per-tag statistics of every report go to a second sheet
+        tag_groups_df = build_tag_groups_df(results_df, folder_path, key_columns(layout)) if args.group_by_tags else None
+
+        # With --bootstrap the runs of every architecture + load level are resampled into two more sheets
+        if args.bootstrap:
+            group_columns = [column for key, column, convert in layout['fields'] if key != 'run']
+            intervals_df, comparison_df = bootstrap_intervals(results_df, group_columns, 'Architecture', args.bootstrap, args.confidence)
+
+        # With --lambda-memory the measured durations of the Lambda reports are priced as Lambda bills them
+        cost_df = None
+        if args.lambda_memory and 'RPS (Requests per Second)' not in results_df.columns:
+            print(f"Skipping the {LAMBDA_COST_SHEET} sheet, the {args.layout} layout has no RPS levels")
+        elif args.lambda_memory:
+            cost_df = lambda_cost_df(results_df, folder_path, args.lambda_memory, args.lambda_architecture, args.billing_overhead)
+
+        # The sketches are only needed to pool percentiles, the raw samples are kept in the samples dataset
+        with pd.ExcelWriter(results_excel_path) as writer:
+            results_df.drop(columns=['Latency Sketch']).to_excel(writer, index=False)
+            if tag_groups_df is not None:
+                tag_groups_df.to_excel(writer, sheet_name='Tag Groups', index=False)
+            if args.bootstrap:
+                intervals_df.to_excel(writer, sheet_name='Bootstrap', index=False)
+                comparison_df.to_excel(writer, sheet_name='Comparison', index=False)
+            if cost_df is not None:
+                cost_df.to_excel(writer, sheet_name=LAMBDA_COST_SHEET, index=False)
+        print(f"Results written to {results_excel_path}")
+
+        if args.store:
+            collection = update_store(args.store, folder_path, results_df, layout)
+            print(f"Stored {len(results_df)} reports of {collection} in {args.store}")
+
+    layout['plot'](results_df, folder_path, jobs, density=args.density, use_cache=not args.no_cache)
+
+def parse_query_args(argv=None):
+    parser = argparse.ArgumentParser(description='Query the results store written by k6-reports --store')
+    parser.add_argument('store', help='SQLite results store')
+    parser.add_argument('--group-by', type=parse_tag_keys, default=['scenario', 'architecture', 'load'], metavar='COLUMNS', help=f'Comma separated columns to group the reports by, from {", ".join(GROUP_COLUMNS)} (default: scenario,architecture,load)')
+    parser.add_argument('--where', help="SQL condition on the reports, e.g. \"architecture = 'lambda' AND load >= 100\"")
+    parser.add_argument('--percentiles', type=lambda value: [float(item) / 100 for item in value.split(',')], default=[0.5, 0.9, 0.99], help='Comma separated pooled percentiles (default: 50,90,99)')
+    parser.add_argument('--exact', action='store_true', help='Compute the pooled percentiles from the samples files instead of the sketches')
+    parser.add_argument('--output', help='Write the result to this .csv or .xlsx file instead of printing it')
+    return parser.parse_args(argv)
+
+def query_main(argv=None):
+    args = parse_query_args(argv)
+    if not os.path.exists(args.store):
+        raise SystemExit(f"{args.store} does not exist, create it with k6-reports --store")
+
+    start = time.perf_counter()
+    try:
+        result_df = query_store(args.store, args.group_by, where=args.where, quantiles=args.percentiles, exact=args.exact)
+    except ValueError as error:
+        raise SystemExit(str(error))
+    elapsed = time.perf_counter() - start
+
+    if args.output and args.output.endswith('.xlsx'):
+        result_df.to_excel(args.output, index=False)
+    elif args.output:
+        result_df.to_csv(args.output, index=False)
+    else:
+        with pd.option_context('display.max_rows', None, 'display.max_columns', None, 'display.width', None):
+            print(result_df.to_string(index=False))
+    print(f"{len(result_df)} groups in {elapsed * 1000:.0f} ms")
+
+def parse_grid(value):
+    # Parse a sweep grid argument: comma separated values or START:STOP:STEP ranges, STOP included
+    values = []
+    try:
+        for item in filter(None, value.split(',')):
+            if ':' in item:
+                start, stop, step = (float(part) for part in item.split(':'))
+                values.extend(np.arange(start, stop + step / 2, step).tolist())
+            else:
+                values.append(float(item))
+    except ValueError:
+        values = []
+    if not values or min(values) <= 0:
+        raise argparse.ArgumentTypeError(f"Invalid grid '{value}', use comma separated positive values or START:STOP:STEP")
+    return values
+
+def parse_choices(choices):
+    # Parse a comma separated list of values from choices
+    def parse(value):
+        items = [item.strip() for item in value.split(',') if item.strip()]
+        unknown = [item for item in items if item not in choices]
+        if unknown or not items:
+            raise argparse.ArgumentTypeError(f"Unknown {', '.join(unknown) or 'empty list'}, use {', '.join(choices)}")
+        return items
+    return parse
+
+def parse_sweep_args(argv=None):
+    parser = argparse.ArgumentParser(description='Breakeven RPS of Lambda against EC2 HA + ALB over a grid of Lambda memory sizes, execution times and instance options')
+    parser.add_argument('folder', nargs='?', default=os.getcwd(), help='Folder where breakeven_sweep.xlsx and the heatmaps are written (default: the current folder)')
+    parser.add_argument('--memory', type=parse_grid, default=parse_grid('128,256,512,1024,1536,2048,3008'), metavar='MB', help='Lambda memory sizes in MB, comma separated or START:STOP:STEP (default: 128,256,512,1024,1536,2048,3008)')
+    parser.add_argument('--duration', type=parse_grid, default=parse_grid('5:300:5'), metavar='MS', help='Lambda execution times in ms, comma separated or START:STOP:STEP (default: 5:300:5)')
+    parser.add_argument('--instance-types', type=parse_choices(INSTANCE_TYPES), default=list(INSTANCE_TYPES), metavar='TYPES', help=f'Comma separated EC2 instance types (default: {",".join(INSTANCE_TYPES)})')
+    parser.add_argument('--pricing', type=parse_choices(PRICING), default=list(PRICING), help=f'Comma separated EC2 pricing (default: {",".join(PRICING)})')
+    parser.add_argument('--instances', type=int, help='Fixed number of EC2 instances instead of scaling 2 instances per --rps-per-step RPS')
+    parser.add_argument('--rps-per-step', type=parse_rps_per_step, default={}, metavar='TYPE:RPS', help='RPS served by every scaling step of 2 instances, as comma separated TYPE:RPS pairs or a single RPS for every type (default: 10)')
+    parser.add_argument('--max-rps', type=float, default=5000, help='Highest RPS searched for breakevens (default: %(default)s)')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of worker processes used for large grids and the heatmaps (0 uses every core)')
+    return parser.parse_args(argv)
+
+def sweep_main(argv=None):
+    args = parse_sweep_args(argv)
+    jobs = args.jobs or os.cpu_count()
+    folder_path = os.path.abspath(args.folder)
+    instance_options = [(instance_type, pricing, INSTANCE_TYPES[instance_type][pricing]) for instance_type in args.instance_types for pricing in args.pricing]
+
+    start = time.perf_counter()
+    first, last, count, intervals = sweep_breakevens(args.memory, args.duration, instance_options, args.max_rps, args.instances, jobs, args.rps_per_step)
+    elapsed = time.perf_counter() - start
+    print(f"{first.size} scenarios in {elapsed * 1000:.0f} ms")
+
+    sweep_path = os.path.join(folder_path, 'breakeven_sweep.xlsx')
+    sweep_table(args.memory, args.duration, instance_options, first, last, count, intervals, args.rps_per_step).to_excel(sweep_path, index=False)
+    print(f"Results written to {sweep_path}")
+    plot_sweep(folder_path, args.memory, args.duration, instance_options, first, args.max_rps, jobs, args.rps_per_step)
+
+def parse_bursts(value):
+    # Parse the --bursts argument: RPS,SECONDS,PER_DAY
+    try:
+        burst_rps, seconds, per_day = (float(item) for item in value.split(','))
+    except ValueError:
+        burst_rps = seconds = per_day = -1
+    if min(burst_rps, seconds, per_day) < 0:
+        raise argparse.ArgumentTypeError(f"Invalid bursts '{value}', use RPS,SECONDS,PER_DAY")
+    return [burst_rps, int(seconds), per_day]
+
+def parse_rps_per_step(value):
+    # Parse the --rps-per-step argument: TYPE:RPS pairs, comma separated, or a single RPS for every instance type
+    capacities = {}
+    try:
+        for item in filter(None, value.split(',')):
+            instance_type, _, rps = item.rpartition(':')
+            for name in [instance_type] if instance_type else INSTANCE_TYPES:
+                if name not in INSTANCE_TYPES:
+                    raise ValueError(name)
+                capacities[name] = float(rps)
+    except ValueError:
+        capacities = {}
+    if not capacities or min(capacities.values()) <= 0:
+        raise argparse.ArgumentTypeError(f"Invalid RPS per step '{value}', use TYPE:RPS pairs from {', '.join(INSTANCE_TYPES)} or a single positive RPS")
+    return capacities
+
+def parse_traffic_args(argv=None):
+    parser = argparse.ArgumentParser(description='Monthly cost of Lambda and autoscaled EC2 HA + ALB under a load that changes over time, simulated second by second')
+    parser.add_argument('folder', nargs='?', default=os.getcwd(), help='Folder where traffic_cost.xlsx and the images are written (default: the current folder)')
+    parser.add_argument('--profile', default='diurnal', help='Load profile: diurnal, a .csv with an rps column (one value every --step seconds) or a k6 timeline .arrow file written by k6-reports --timeline (default: %(default)s)')
+    parser.add_argument('--peak-rps', type=float, default=30, help='Peak RPS of the diurnal profile (default: %(default)s)')
+    parser.add_argument('--trough-rps', type=float, default=2, help='Night RPS of the diurnal profile (default: %(default)s)')
+    parser.add_argument('--peak-hour', type=float, default=14, help='Hour of the peak of the diurnal profile (default: %(default)s)')
+    parser.add_argument('--bursts', type=parse_bursts, metavar='RPS,SECONDS,PER_DAY', help='Add bursts of RPS extra requests per second lasting SECONDS, PER_DAY times a day at random times')
+    parser.add_argument('--step', type=int, default=3600, help='Seconds between the values of a .csv profile, 3600 hourly or 60 minutely (default: %(default)s)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplier of the RPS of a .csv or timeline profile (default: %(default)s)')
+    parser.add_argument('--window', type=float, metavar='SECONDS', help='Window length of a timeline profile, read from its Requests and Achieved RPS by default')
+    parser.add_argument('--memory', type=float, default=1536, metavar='MB', help='Lambda memory in MB (default: %(default)s)')
+    parser.add_argument('--duration', type=float, default=194, metavar='MS', help='Lambda billed duration per request in ms (default: %(default)s)')
+    parser.add_argument('--measured', metavar='RESULTS_XLSX', help='Use the mean billed duration of the Lambda Cost sheet of this results.xlsx (k6-reports --lambda-memory) instead of --duration')
+    parser.add_argument('--instance-types', type=parse_choices(INSTANCE_TYPES), default=['t3.small'], metavar='TYPES', help=f'Comma separated EC2 instance types, from {", ".join(INSTANCE_TYPES)} (default: t3.small)')
+    parser.add_argument('--pricing', type=parse_choices(PRICING), default=list(PRICING), help=f'Comma separated EC2 pricing (default: {",".join(PRICING)})')
+    parser.add_argument('--rps-per-step', type=parse_rps_per_step, default={}, metavar='TYPE:RPS', help='RPS served by every scaling step of 2 instances, as comma separated TYPE:RPS pairs or a single RPS for every type (default: 10)')
+    parser.add_argument('--scale-out-delay', type=int, default=SCALE_OUT_DELAY_SECONDS, metavar='SECONDS', help='Seconds before a new instance takes traffic (default: %(default)s)')
+    parser.add_argument('--scale-in-cooldown', type=int, default=SCALE_IN_COOLDOWN_SECONDS, metavar='SECONDS', help='Seconds the load must ask for fewer instances before they are terminated (default: %(default)s)')
+    return parser.parse_args(argv)
+
+def traffic_main(argv=None):
+    args = parse_traffic_args(argv)
+    folder_path = os.path.abspath(args.folder)
+    instance_options = [(instance_type, pricing, INSTANCE_TYPES[instance_type][pricing]) for instance_type in args.instance_types for pricing in args.pricing]
+
+    if args.profile == 'diurnal':
+        rps = diurnal_profile(args.peak_rps, args.trough_rps, args.peak_hour)
+    elif args.profile.endswith('.csv'):
+        profile_df = pd.read_csv(args.profile)
+        rps = series_profile(profile_df['rps' if 'rps' in profile_df.columns else profile_df.columns[-1]].to_numpy() * args.scale, args.step)
+    elif args.profile.endswith('.arrow'):
+        try:
+            rps = timeline_profile(args.profile, args.scale, args.window)
+        except ValueError as error:
+            raise SystemExit(str(error))
+    else:
+        raise SystemExit(f"Unknown profile '{args.profile}', use diurnal, a .csv file or a timeline .arrow file")
+    if args.bursts:
+        rps = add_bursts(rps, *args.bursts)
+
+    execution_time_ms = args.duration
+    if args.measured:
+        execution_time_ms = measured_billed_duration_ms(args.measured)
+        if execution_time_ms is None:
+            raise SystemExit(f"{args.measured} has no Lambda Cost sheet, write it with k6-reports --lambda-memory")
+        print(f"Using the measured mean billed duration of {execution_time_ms:.2f} ms")
+
+    start = time.perf_counter()
+    result_df, simulations = simulation_table(rps, args.memory, execution_time_ms, instance_options, args.rps_per_step, scale_out_delay=args.scale_out_delay, scale_in_cooldown=args.scale_in_cooldown)
+    elapsed = time.perf_counter() - start
+    print(f"{len(rps)} seconds simulated for {len(instance_options)} instance options in {elapsed * 1000:.0f} ms")
+    with pd.option_context('display.max_rows', None, 'display.max_columns', None, 'display.width', None):
+        print(result_df.T.to_string(header=False))
+
+    traffic_path = os.path.join(folder_path, 'traffic_cost.xlsx')
+    result_df.to_excel(traffic_path, index=False)
+    print(f"Results written to {traffic_path}")
+    # One figure per simulation, shared by the instance types with the same RPS per scaling step
+    figures = []
+    for capacity, (desired, running, serving) in simulations.items():
+        instance_types = result_df.loc[result_df['RPS per Scaling Step'] == capacity, 'Instance Type'].unique()
+        figures.append((draw_traffic_simulation, {
+            'path': os.path.join(folder_path, f"traffic_simulation_{'_'.join(instance_types)}.png"),
+            'title': f"{args.profile} load, EC2 HA {', '.join(instance_types)} at {capacity:g} RPS per scaling step (first week)",
+            'rps': rps, 'desired': desired, 'running': running, 'serving': serving,
+        }))
+    render_figures(figures)
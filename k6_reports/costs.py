@@ -0,0 +1,117 @@
+import numpy as np
+
+# Monthly cost model of the breakeven.py scripts of chapter5. Every function takes NumPy arrays (or scalars) of RPS
+# and prices and broadcasts them, so a whole curve or grid of scenarios is evaluated in one call.
+
+# AWS prices (N.Virginia us-east-1 region)
+HOURS_PER_MONTH = 730  # Average hours per month according to AWS's calculator
+SECONDS_IN_MONTH = HOURS_PER_MONTH * 60 * 60
+LCU_COST_PER_HOUR = 0.008  # Cost per LCU per hour in dollars
+ALB_FIXED_MONTHLY_COST = 16.43  # Monthly fixed cost for Application Load Balancer (ALB)
+LAMBDA_REQUEST_COST_PER_MILLION = 0.20  # Cost per 1 million requests
+
+# Lambda tiered pricing for GB-seconds: (GB-seconds per month where the tier ends, cost per GB-second)
+LAMBDA_GB_SECOND_TIERS = [
+    (6_000_000_000, 0.0000166667),  # First 6 billion GB-seconds
+    (15_000_000_000, 0.000015),  # Next 9 billion GB-seconds
+    (np.inf, 0.0000133333),  # Beyond 15 billion GB-seconds
+]
+
+# EC2 horizontal scaling of the bursty scenario: 2 instances per 10 RPS, never less than 2 for High Availability (HA)
+RPS_PER_SCALING_STEP = 10
+INSTANCES_PER_SCALING_STEP = 2
+MIN_INSTANCES = 2
+
+def lambda_compute_cost(gb_seconds, tiers=LAMBDA_GB_SECOND_TIERS):
+    # Each tier charges the GB-seconds between the limit of the previous tier and its own limit
+    gb_seconds = np.asarray(gb_seconds, dtype=np.float64)
+    cost = 0.0
+    start = 0
+    for limit, cost_per_gb_second in tiers:
+        cost = cost + (np.clip(gb_seconds, start, limit) - start) * cost_per_gb_second
+        start = limit
+    return cost
+
+def lambda_request_cost(monthly_requests, cost_per_million=LAMBDA_REQUEST_COST_PER_MILLION):
+    return monthly_requests * cost_per_million / 1_000_000
+
+def lambda_monthly_requests(rps):
+    return np.asarray(rps, dtype=np.float64) * SECONDS_IN_MONTH
+
+def lambda_cost(rps, memory_mb, execution_time_ms, tiers=LAMBDA_GB_SECOND_TIERS, request_cost_per_million=LAMBDA_REQUEST_COST_PER_MILLION):
+    # Monthly Lambda cost of a constant rps with tiered pricing
+    monthly_requests = lambda_monthly_requests(rps)
+    gb_seconds = monthly_requests * (np.asarray(execution_time_ms) / 1000) * (np.asarray(memory_mb) / 1024)
+    return lambda_compute_cost(gb_seconds, tiers) + lambda_request_cost(monthly_requests, request_cost_per_million)
+
+def alb_lcus(processed_bytes_gb_per_hour=1, new_connections_per_second=10, average_connection_duration_seconds=1, paid_rules_lcus=0):
+    # LCUs are billed by the dimension that uses the most of them
+    processed_bytes_lcus = np.asarray(processed_bytes_gb_per_hour, dtype=np.float64) / 1  # 1 GB processed per hour per LCU
+    new_connections_lcus = np.asarray(new_connections_per_second, dtype=np.float64) / 25  # 25 new connections per second per LCU
+    active_connections = new_connections_per_second * np.asarray(average_connection_duration_seconds)
+    active_connections_lcus = active_connections / 3000  # 3000 active connections per LCU
+    return np.maximum(np.maximum(processed_bytes_lcus, new_connections_lcus), np.maximum(active_connections_lcus, paid_rules_lcus))
+
+def alb_cost(processed_bytes_gb_per_hour=1, new_connections_per_second=10, average_connection_duration_seconds=1, paid_rules_lcus=0):
+    # Monthly LCU cost of the ALB, on top of ALB_FIXED_MONTHLY_COST
+    return alb_lcus(processed_bytes_gb_per_hour, new_connections_per_second, average_connection_duration_seconds, paid_rules_lcus) * LCU_COST_PER_HOUR * HOURS_PER_MONTH
+
+def instance_count(rps, rps_per_step=RPS_PER_SCALING_STEP, instances_per_step=INSTANCES_PER_SCALING_STEP, min_instances=MIN_INSTANCES):
+    # Step function of the instances needed for rps, a new step starts just above every multiple of rps_per_step
+    return np.maximum(min_instances, ((np.asarray(rps, dtype=np.float64) - 0.01) // rps_per_step + 1) * instances_per_step)
+
+def ec2_cost(rps, instance_monthly_cost, instances=None):
+    # Monthly cost of the EC2 instances, a fixed number of instances or the scaling steps of instance_count
+    if instances is None:
+        instances = instance_count(rps)
+    return np.asarray(instance_monthly_cost) * instances + np.zeros(np.shape(rps))
+
+def ec2_ha_cost(rps, instance_monthly_cost, instances=None):
+    # Monthly cost of the EC2 instances behind an ALB, with its fixed cost and the LCUs of one new connection per request
+    return ec2_cost(rps, instance_monthly_cost, instances) + ALB_FIXED_MONTHLY_COST + alb_cost(new_connections_per_second=np.asarray(rps, dtype=np.float64))
+
+# Breakpoints: RPS where a cost changes its slope or steps. Between consecutive breakpoints every cost above is a
+# straight line in rps, so the breakevens are found exactly from two evaluations per segment.
+
+def lambda_breakpoints(memory_mb, execution_time_ms, tiers=LAMBDA_GB_SECOND_TIERS):
+    # RPS where the GB-seconds reach the limit of every tier
+    gb_seconds_per_rps = SECONDS_IN_MONTH * (np.asarray(execution_time_ms) / 1000) * (np.asarray(memory_mb) / 1024)
+    limits = np.array([limit for limit, cost_per_gb_second in tiers if np.isfinite(limit)])
+    return np.ravel(limits / np.asarray(gb_seconds_per_rps)[..., np.newaxis])
+
+def alb_breakpoints(processed_bytes_gb_per_hour=1, average_connection_duration_seconds=1, paid_rules_lcus=0):
+    # RPS where the new or active connections LCUs overtake the processed bytes or paid rules LCUs
+    fixed_lcus = np.array([processed_bytes_gb_per_hour, paid_rules_lcus], dtype=np.float64)
+    return np.concatenate([fixed_lcus * 25, fixed_lcus * 3000 / average_connection_duration_seconds])
+
+def instance_breakpoints(high, rps_per_step=RPS_PER_SCALING_STEP):
+    # RPS where instance_count adds a step, up to high
+    return np.arange(1, high // rps_per_step + 1) * rps_per_step + 0.01
+
+def breakeven_crossings(cost_a, cost_b, breakpoints, low, high):
+    # RPS in [low, high] where cost_a stops or starts being cheaper than cost_b: the root of the line of every segment
+    # between breakpoints and the steps that jump over the other cost. The costs may broadcast to (..., rps) for a grid
+    # of scenarios. Returns the crossings in RPS order as (..., crossings) with NaN where there is none, and whether
+    # cost_a is cheaper at low.
+    edges = np.unique(np.clip(np.concatenate([[low, high], np.ravel(breakpoints)]), low, high))
+    starts, ends = edges[:-1], edges[1:]
+
+    # Each segment is evaluated at its thirds, away from the steps at its edges
+    third = (ends - starts) / 3
+    first = cost_a(starts + third) - cost_b(starts + third)
+    second = cost_a(ends - third) - cost_b(ends - third)
+    slopes = (second - first) / third
+    cheaper_start = first - slopes * third < 0
+    cheaper_end = second + slopes * third < 0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roots = np.clip(starts + third - first / slopes, starts, ends)
+    crossings = np.full(roots.shape[:-1] + (2 * len(starts) - 1,), np.nan)
+    crossings[..., 0::2] = np.where(cheaper_start != cheaper_end, roots, np.nan)
+    crossings[..., 1::2] = np.where(cheaper_end[..., :-1] != cheaper_start[..., 1:], starts[1:], np.nan)
+    return crossings, cheaper_start[..., 0]
+
+def cheaper_intervals(crossings, cheaper_at_low, low, high):
+    # (start, end) RPS intervals where cost_a is cheaper, from the breakeven_crossings of one pair of costs
+    bounds = [low] + crossings[~np.isnan(crossings)].tolist() + [high]
+    return [(start, end) for index, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])) if (index % 2 == 0) == bool(cheaper_at_low)]
@@ -0,0 +1,47 @@
+import os
+import pyarrow as pa
+
+# Raw samples are stored next to results.xlsx as a hive-partitioned dataset of Arrow IPC files,
+# one file per report, which pyarrow.dataset and DuckDB can read as a single table
+SAMPLES_FOLDER = 'samples'
+
+# Per-window timelines, per-tag groups and the fixed-size reservoir samples of the plots use the same layout
+# in their own datasets
+TIMELINES_FOLDER = 'timelines'
+TAG_GROUPS_FOLDER = 'tag_groups'
+RESERVOIRS_FOLDER = 'reservoirs'
+
+def samples_file(keys):
+    # Relative path of the samples of a report, keys is a list of (partition name, value) pairs
+    return os.path.join(SAMPLES_FOLDER, *[f'{name}={value}' for name, value in keys], 'samples.arrow')
+
+def reservoir_file(keys):
+    return os.path.join(RESERVOIRS_FOLDER, *[f'{name}={value}' for name, value in keys], 'reservoir.arrow')
+
+def timeline_file(keys):
+    return os.path.join(TIMELINES_FOLDER, *[f'{name}={value}' for name, value in keys], 'timeline.arrow')
+
+def write_samples(path, response_times):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.table({'response_time': response_times})
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+def tag_groups_file(keys):
+    return os.path.join(TAG_GROUPS_FOLDER, *[f'{name}={value}' for name, value in keys], 'tag_groups.arrow')
+
+def write_frame(path, df):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+def load_samples(path):
+    # The file is memory-mapped and the array is a zero-copy view over it
+    reader = pa.ipc.open_file(pa.memory_map(path))
+    if reader.num_record_batches == 1:
+        return reader.get_batch(0).column('response_time').to_numpy()
+    return reader.read_all().column('response_time').to_numpy()
+
+def load_frame(path):
+    return pa.ipc.open_file(pa.memory_map(path)).read_all().to_pandas()
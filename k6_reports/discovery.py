@@ -0,0 +1,85 @@
+import os
+import re
+import orjson
+from fnmatch import translate
+
+from .layouts import LAYOUTS, extract_metadata
+
+# File name globs of the k6 reports and globs of the files and directories left out. Excluded directories are pruned
+# before they are listed. A glob with a / is matched against the path relative to the searched folder, any other
+# glob against the name of the file or directory.
+DEFAULT_INCLUDE = ['k6-report*.json', 'k6-report*.json.gz', 'k6-report*.json.zst']
+DEFAULT_EXCLUDE = ['*warmup*', '*m5.large*']
+
+# Reports found by the last search of a folder with their metadata, stored next to results.xlsx.
+# --from-manifest reads it instead of searching the folder again. Bump MANIFEST_VERSION whenever its layout changes.
+MANIFEST_FILE = '.k6-reports-manifest.json'
+MANIFEST_VERSION = 1
+
+def compile_globs(globs):
+    # One regex for the name globs and one for the path globs, a regex that never matches when there is none
+    name_globs = [translate(glob) for glob in globs if '/' not in glob]
+    path_globs = [translate(glob) for glob in globs if '/' in glob]
+    return [re.compile('|'.join(patterns) if patterns else r'(?!)').match for patterns in (name_globs, path_globs)]
+
+def matches(name, relative_path, compiled_globs):
+    match_name, match_path = compiled_globs
+    return match_name(name) is not None or match_path(relative_path) is not None
+
+def scan_reports(folder_path, include=DEFAULT_INCLUDE, exclude=DEFAULT_EXCLUDE):
+    # Paths relative to folder_path of the reports. os.scandir reads the entry types from the directory listing,
+    # so no file is stat'ed during the search.
+    include, exclude = compile_globs(include), compile_globs(exclude)
+    json_files = []
+    pending = ['']
+    while pending:
+        relative_folder = pending.pop()
+        with os.scandir(os.path.join(folder_path, relative_folder)) as entries:
+            for entry in entries:
+                relative_path = f'{relative_folder}/{entry.name}' if relative_folder else entry.name
+                if matches(entry.name, relative_path, exclude):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(relative_path)
+                elif matches(entry.name, relative_path, include):
+                    json_files.append(relative_path)
+    return json_files
+
+def find_reports(folder_path, layout_name, include=DEFAULT_INCLUDE, exclude=DEFAULT_EXCLUDE):
+    # k6 reports under folder_path, reports whose path does not follow the layout are left out.
+    # The manifest of the reports found is written for later runs with --from-manifest.
+    reports = []
+    for relative_path in sorted(scan_reports(folder_path, include, exclude)):
+        keys = extract_metadata(os.path.join(folder_path, relative_path), LAYOUTS[layout_name])
+        if keys is None:
+            print(f"Skipping {relative_path}, its path does not follow the {layout_name} layout")
+            continue
+        reports.append({'file': relative_path, 'metadata': dict(keys)})
+    save_manifest(os.path.join(folder_path, MANIFEST_FILE), {'layout': layout_name, 'include': include, 'exclude': exclude, 'reports': reports})
+    return [os.path.join(folder_path, report['file']) for report in reports]
+
+def save_manifest(manifest_path, manifest):
+    # Written to a temporary file first, so an interrupted run never leaves a truncated manifest behind
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(orjson.dumps({'version': MANIFEST_VERSION, **manifest}, option=orjson.OPT_INDENT_2))
+    os.replace(temp_path, manifest_path)
+
+def load_manifest(manifest_path):
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'rb') as f:
+        manifest = orjson.loads(f.read())
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+def manifest_reports(folder_path, layout_name, include=DEFAULT_INCLUDE, exclude=DEFAULT_EXCLUDE):
+    # Reports of the manifest written by the last search, without listing any directory. The folder is searched
+    # again when there is no manifest or it was written for another layout or other globs.
+    manifest = load_manifest(os.path.join(folder_path, MANIFEST_FILE))
+    if manifest is None or [manifest['layout'], manifest['include'], manifest['exclude']] != [layout_name, include, exclude]:
+        print(f"No manifest of the {layout_name} reports with these globs in {folder_path}, searching the folder")
+        return find_reports(folder_path, layout_name, include, exclude)
+    print(f"Using the {len(manifest['reports'])} reports of {MANIFEST_FILE}")
+    return [os.path.join(folder_path, report['file']) for report in manifest['reports']]
@@ -0,0 +1,680 @@
+import os
+import gzip
+import mmap
+import queue
+import orjson
+import threading
+import numpy as np
+import pandas as pd
+
+from .sketch import SKETCH_RELATIVE_ERROR, LatencySketch
+
+# Size of the blocks read from each k6 report, small enough for a block to still be in the CPU cache when its lines
+# are scanned right after it was read or decompressed
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# Decompressed blocks a compressed report can be ahead of the parser
+DECOMPRESSED_BLOCKS = 2
+
+# Layout of the Point lines k6 writes, used to find the time and value of every Point in the bytes of a block
+# without decoding the line: {"metric":"...","type":"Point","data":{"time":"...","value":...,"tags":{...}}}.
+# The Metric definition lines are written {"type":"Metric","data":{...},"metric":"..."}.
+METRIC_KEY = b'{"metric":"'
+POINT_KEY = b'","type":"Point","data":{"time":"'
+DEFINITION_KEY = b'","type":"Metric",'
+DEFINITION_PREFIX = b'{"type":"Metric",'
+VALUE_KEY = b'","value":'
+# The times are RFC 3339 with up to nanoseconds and a UTC offset, at most 35 bytes, and always begin with the 19 bytes
+# of the date and the time of day, so their closing quote is only searched after those
+TIME_WIDTH = 36
+TIME_DATE_BYTES = 19
+# A float64 in JSON takes at most 24 bytes (-1.2345678901234567e-308), the comma or brace after it is searched too
+VALUE_WIDTH = 25
+LINE_SEARCH_BYTES = 1024 * 1024
+
+# k6 metrics that can be collected from a report and their kind. Every trend gets the full latency statistics,
+# rates the share of non-zero values, counters their total and gauges their min/max/mean. Metrics written by
+# custom k6 scripts can be added from the command line as name:kind.
+METRICS = {
+    'http_req_duration': 'trend',
+    'http_req_failed': 'rate',
+    'http_req_blocked': 'trend',
+    'http_req_connecting': 'trend',
+    'http_req_tls_handshaking': 'trend',
+    'http_req_sending': 'trend',
+    'http_req_waiting': 'trend',
+    'http_req_receiving': 'trend',
+    'iteration_duration': 'trend',
+    'http_reqs': 'counter',
+    'iterations': 'counter',
+    'dropped_iterations': 'counter',
+    'data_sent': 'counter',
+    'data_received': 'counter',
+    'vus': 'gauge',
+    'vus_max': 'gauge',
+}
+
+# Always collected, they provide the main columns of results.xlsx
+DEFAULT_METRICS = {'http_req_duration': 'trend', 'http_req_failed': 'rate'}
+
+METRIC_STATS = {
+    'trend': ['Count', 'Min', 'Max', 'Mean', 'Median', 'P90', 'P99'],
+    'rate': ['Count', 'Rate'],
+    'counter': ['Count', 'Total'],
+    'gauge': ['Min', 'Max', 'Mean'],
+}
+
+def metric_marker(name):
+    # Byte marker used to find the lines of a metric before decoding them with orjson
+    return b'"metric":"' + name.encode() + b'"'
+
+def metric_columns(metrics):
+    # Columns added to results.xlsx for the metrics collected on top of DEFAULT_METRICS
+    return [f'{name} {stat}' for name, kind in metrics.items() if name not in DEFAULT_METRICS for stat in METRIC_STATS[kind]]
+
+class SampleBuffer:
+    # Growable float64 array, so samples are not kept as a list of boxed Python floats
+    def __init__(self, capacity=65536):
+        self.data = np.empty(capacity, dtype=np.float64)
+        self.size = 0
+
+    def extend(self, values):
+        count = len(values)
+        if self.size + count > len(self.data):
+            data = np.empty(max(len(self.data) * 2, self.size + count), dtype=np.float64)
+            data[:self.size] = self.data[:self.size]
+            self.data = data
+        self.data[self.size:self.size + count] = values
+        self.size += count
+
+    def values(self):
+        return self.data[:self.size]
+
+class MetricCollector:
+    # Values of one metric of a report. Trends keep every sample (or only a sketch when keep_samples is False),
+    # the other kinds only keep running totals.
+    def __init__(self, kind, keep_samples=True, relative_error=SKETCH_RELATIVE_ERROR):
+        self.kind = kind
+        self.samples = SampleBuffer() if kind == 'trend' and keep_samples else None
+        self.sketch = LatencySketch(relative_error) if kind == 'trend' else None
+        self.count = 0
+        self.total = 0.0
+        self.nonzero = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def add(self, values):
+        if len(values) == 0:
+            return
+        if self.sketch is not None:
+            self.sketch.add(values)
+        if self.samples is not None:
+            self.samples.extend(values)
+        self.count += len(values)
+        self.total += float(np.sum(values))
+        self.nonzero += int(np.count_nonzero(values))
+        self.min = min(self.min, float(np.min(values)))
+        self.max = max(self.max, float(np.max(values)))
+
+    def stats(self):
+        if self.count == 0:
+            # A counter without points (e.g. dropped_iterations) counted nothing, the other statistics are undefined
+            return {'Count': 0, 'Total': 0.0} if self.kind == 'counter' else {'Count': 0, **{stat: None for stat in METRIC_STATS[self.kind] if stat != 'Count'}}
+        if self.kind == 'rate':
+            return {'Count': self.count, 'Rate': self.nonzero / self.count}
+        if self.kind == 'counter':
+            return {'Count': self.count, 'Total': self.total}
+        if self.kind == 'gauge':
+            return {'Min': self.min, 'Max': self.max, 'Mean': self.total / self.count}
+        if self.samples is not None:
+            values = self.samples.values()
+            return {'Count': self.count, 'Min': np.min(values), 'Max': np.max(values), 'Mean': np.mean(values), 'Median': np.median(values),
+                    'P90': np.percentile(values, 90), 'P99': np.percentile(values, 99)}
+        return {'Count': self.count, 'Min': self.sketch.min, 'Max': self.sketch.max, 'Mean': self.sketch.mean(), 'Median': self.sketch.quantile(0.5),
+                'P90': self.sketch.quantile(0.9), 'P99': self.sketch.quantile(0.99)}
+
+def merge_counts(keys, counts, new_keys, new_counts):
+    # Add new_counts to the sorted unique keys/counts pair, keys seen for the first time are inserted.
+    # The result keeps the dtype of counts, so the same merge also accumulates float sums.
+    keys, inverse = np.unique(np.concatenate([keys, new_keys]), return_inverse=True)
+    return keys, np.bincount(inverse, weights=np.concatenate([counts, new_counts]), minlength=len(keys)).astype(counts.dtype)
+
+def grouped_quantiles(sketch, keys, counts, groups, q):
+    # Quantile q of every group at once, keys are the sorted group * bucket_count + bucket pairs of sketch,
+    # so each group is a contiguous run of buckets
+    bucket_count = len(sketch.counts)
+    key_groups = keys // bucket_count
+    cumulative = np.cumsum(counts)
+    first = np.searchsorted(key_groups, groups, side='left')
+    last = np.searchsorted(key_groups, groups, side='right')
+    before = np.where(first > 0, cumulative[first - 1], 0)
+    totals = cumulative[last - 1] - before
+    positions = np.searchsorted(cumulative, before + q * (totals - 1), side='right')
+    return sketch.bucket_values(keys[positions] % bucket_count)
+
+def parse_timestamps(times):
+    # k6 writes RFC 3339 timestamps with nanoseconds and the local UTC offset, they are parsed in one vectorized call
+    return pd.to_datetime(times, format='ISO8601', utc=True).asi8
+
+class Timeline:
+    # Per-window request counts, failures and latency sketches of a report. Windows are keyed by their absolute
+    # epoch index and only the (window, sketch bucket) pairs that actually occur are stored, so memory grows with
+    # the run duration and not with the number of requests.
+    def __init__(self, window_seconds, relative_error=SKETCH_RELATIVE_ERROR):
+        self.window_seconds = window_seconds
+        self.window_ns = int(window_seconds * 1e9)
+        self.sketch = LatencySketch(relative_error)
+        self.bucket_count = len(self.sketch.counts)
+        self.latency_keys = np.empty(0, dtype=np.int64)
+        self.latency_counts = np.empty(0, dtype=np.int64)
+        self.failure_keys = np.empty(0, dtype=np.int64)
+        self.failure_counts = np.empty(0, dtype=np.int64)
+        self.sum_keys = np.empty(0, dtype=np.int64)
+        self.sums = np.empty(0, dtype=np.float64)
+
+    def add_durations(self, times_ns, values):
+        windows = times_ns // self.window_ns
+        keys = windows * self.bucket_count + self.sketch.bucket_indexes(values)
+        self.latency_keys, self.latency_counts = merge_counts(self.latency_keys, self.latency_counts, keys, np.ones(len(keys), dtype=np.int64))
+        self.sum_keys, self.sums = merge_counts(self.sum_keys, self.sums, windows, values)
+
+    def add_failures(self, times_ns, failed):
+        keys = (times_ns // self.window_ns) * 2 + (np.asarray(failed) != 0)
+        self.failure_keys, self.failure_counts = merge_counts(self.failure_keys, self.failure_counts, keys, np.ones(len(keys), dtype=np.int64))
+
+    def quantiles(self, windows, q):
+        return grouped_quantiles(self.sketch, self.latency_keys, self.latency_counts, windows, q)
+
+    def windows(self):
+        # Absolute indexes of the windows with requests and the number of requests in each of them
+        key_windows = self.latency_keys // self.bucket_count
+        windows = np.unique(key_windows)
+        return windows, np.bincount(np.searchsorted(windows, key_windows), weights=self.latency_counts, minlength=len(windows)).astype(np.int64)
+
+    def range_stats(self, first, last):
+        # Statistics of the requests in windows first..last (inclusive), merged from the per-window sketches
+        start, end = np.searchsorted(self.latency_keys, [first * self.bucket_count, (last + 1) * self.bucket_count])
+        sketch = LatencySketch(self.sketch.relative_error)
+        sketch.counts = np.bincount(self.latency_keys[start:end] % self.bucket_count, weights=self.latency_counts[start:end], minlength=self.bucket_count).astype(np.int64)
+        sketch.count = int(sketch.counts.sum())
+        if sketch.count == 0:
+            return {'Count': 0, 'Mean': None, 'Median': None, 'P90': None, 'P99': None, 'Fail': 0}
+        sketch.sum = float(self.sums[(self.sum_keys >= first) & (self.sum_keys <= last)].sum())
+        buckets = np.flatnonzero(sketch.counts)
+        sketch.min, sketch.max = sketch.bucket_values([buckets[0], buckets[-1]])
+        in_range = (self.failure_keys // 2 >= first) & (self.failure_keys // 2 <= last)
+        failed = int(self.failure_counts[in_range & (self.failure_keys % 2 == 1)].sum())
+        return {'Count': sketch.count, 'Mean': sketch.mean(), 'Median': sketch.quantile(0.5), 'P90': sketch.quantile(0.9), 'P99': sketch.quantile(0.99), 'Fail': failed}
+
+    def to_frame(self):
+        if len(self.latency_keys) == 0:
+            return pd.DataFrame(columns=['Window Start', 'Elapsed Seconds', 'Requests', 'Achieved RPS', 'P50 Response Time', 'P99 Response Time', 'Failure Rate'])
+        windows, requests = self.windows()
+
+        failure_windows = self.failure_keys // 2
+        known = np.isin(failure_windows, windows)
+        positions = np.searchsorted(windows, failure_windows[known])
+        checked = np.bincount(positions, weights=self.failure_counts[known], minlength=len(windows))
+        failed = np.bincount(positions, weights=self.failure_counts[known] * (self.failure_keys[known] % 2), minlength=len(windows))
+
+        return pd.DataFrame({
+            'Window Start': pd.to_datetime(windows * self.window_ns, utc=True),
+            'Elapsed Seconds': (windows - windows[0]) * self.window_seconds,
+            'Requests': requests,
+            'Achieved RPS': requests / self.window_seconds,
+            'P50 Response Time': self.quantiles(windows, 0.5),
+            'P99 Response Time': self.quantiles(windows, 0.99),
+            'Failure Rate': np.divide(failed, checked, out=np.full(len(windows), np.nan), where=checked > 0),
+        })
+
+# Trimming uses windows of TRIM_WINDOW_SECONDS. With --trim auto the steady state spans from the first to the last run
+# of STEADY_STATE_SECONDS consecutive windows whose achieved RPS is within STEADY_STATE_TOLERANCE of the median
+# achieved RPS of the report, so the ramp-up and the tail of the run are left out.
+TRIM_WINDOW_SECONDS = 1
+STEADY_STATE_SECONDS = 5
+STEADY_STATE_TOLERANCE = 0.1
+
+TRIM_COLUMNS = ['Trim Start Seconds', 'Trim End Seconds', 'Trimmed Request Count', 'Trimmed Mean Response Time', 'Trimmed Median Response Time',
+                'Trimmed P90 Response Time', 'Trimmed P99 Response Time', 'Trimmed HTTP Codes Fail']
+
+def trim_columns(trim):
+    # Columns added to results.xlsx when the reports are trimmed
+    return TRIM_COLUMNS if trim else []
+
+def steady_state_windows(windows, requests, trim, window_seconds):
+    # First and last window kept after trimming, windows and requests come from Timeline.windows()
+    if trim != 'auto':
+        lead, trail = trim
+        return windows[0] + int(np.ceil(lead / window_seconds)), windows[-1] - int(np.ceil(trail / window_seconds))
+    achieved_rps = np.zeros(windows[-1] - windows[0] + 1)
+    achieved_rps[windows - windows[0]] = requests / window_seconds
+    target = np.median(achieved_rps)
+    stable = np.abs(achieved_rps - target) <= STEADY_STATE_TOLERANCE * target
+    run = max(1, int(round(STEADY_STATE_SECONDS / window_seconds)))
+    starts = np.flatnonzero(np.convolve(stable, np.ones(run, dtype=np.int64), mode='valid') == run)
+    if len(starts) == 0:
+        return windows[0], windows[-1]  # No steady state found, nothing is trimmed
+    return windows[0] + starts[0], windows[0] + starts[-1] + run - 1
+
+def trimmed_stats(timeline, trim):
+    # Values of TRIM_COLUMNS, the trimmed range is given in seconds since the first window of the report
+    windows, requests = timeline.windows()
+    first, last = steady_state_windows(windows, requests, trim, timeline.window_seconds)
+    stats = timeline.range_stats(first, last)
+    return [float((first - windows[0]) * timeline.window_seconds), float((last + 1 - windows[0]) * timeline.window_seconds),
+            stats['Count'], stats['Mean'], stats['Median'], stats['P90'], stats['P99'], stats['Fail']]
+
+class Reservoir:
+    # Fixed-size sample of the durations of a report for the scatter plots, exact statistics still come from the
+    # collectors. Every value gets a random key and the values with the smallest keys are kept, a uniform sample of
+    # everything added so far. With window_seconds the sample is stratified by time window: the same number of
+    # smallest keys is kept from every window, so quiet and busy periods of the run are both represented.
+    def __init__(self, size, window_seconds=None, seed=0):
+        self.size = size
+        self.window_ns = int(window_seconds * 1e9) if window_seconds else None
+        self.rng = np.random.default_rng(seed)
+        # Values kept per window, halved whenever the windows together keep more than twice size
+        self.cap = size
+        self.windows = np.empty(0, dtype=np.int64)
+        self.keys = np.empty(0, dtype=np.float64)
+        self.kept = np.empty(0, dtype=np.float64)
+
+    def ranks(self):
+        # Sort the kept values by window and key, returning the rank of every value within its window
+        order = np.lexsort((self.keys, self.windows))
+        self.windows, self.keys, self.kept = self.windows[order], self.keys[order], self.kept[order]
+        return np.arange(len(self.windows)) - np.searchsorted(self.windows, self.windows, side='left')
+
+    def add(self, values, times_ns=None):
+        if len(values) == 0:
+            return
+        windows = times_ns // self.window_ns if self.window_ns else np.zeros(len(values), dtype=np.int64)
+        self.windows = np.concatenate([self.windows, windows])
+        self.keys = np.concatenate([self.keys, self.rng.random(len(values))])
+        self.kept = np.concatenate([self.kept, values])
+        ranks = self.ranks()
+        while self.cap > 1 and np.count_nonzero(ranks < self.cap) > 2 * self.size:
+            self.cap //= 2
+        keep = ranks < self.cap
+        self.windows, self.keys, self.kept = self.windows[keep], self.keys[keep], self.kept[keep]
+
+    def values(self):
+        # At most size values, taken from every window in turn by rank, in time window order
+        ranks = self.ranks()
+        chosen = np.lexsort((self.keys, ranks))[:self.size]
+        return self.kept[np.sort(chosen)]
+
+class TagGroups:
+    # Requests, failures and latency sketches of a report split by the values of some k6 tags. Every combination of
+    # tag values is interned once to a small integer code, so the points are grouped with bincount on the codes and
+    # only one dict lookup per line is done in Python. The percentiles come from the sketch buckets of each group.
+    def __init__(self, tag_keys, relative_error=SKETCH_RELATIVE_ERROR):
+        self.tag_keys = tag_keys
+        self.codes = {}
+        self.sketch = LatencySketch(relative_error)
+        self.bucket_count = len(self.sketch.counts)
+        self.latency_keys = np.empty(0, dtype=np.int64)
+        self.latency_counts = np.empty(0, dtype=np.int64)
+        self.failure_keys = np.empty(0, dtype=np.int64)
+        self.failure_counts = np.empty(0, dtype=np.int64)
+        self.sums = np.zeros(0)
+        self.maxs = np.zeros(0)
+
+    def code(self, tags):
+        values = tuple(tags.get(key) for key in self.tag_keys)
+        code = self.codes.get(values)
+        if code is None:
+            code = self.codes[values] = len(self.codes)
+        return code
+
+    def add_durations(self, codes, values):
+        codes = np.asarray(codes, dtype=np.int64)
+        keys = codes * self.bucket_count + self.sketch.bucket_indexes(values)
+        self.latency_keys, self.latency_counts = merge_counts(self.latency_keys, self.latency_counts, keys, np.ones(len(keys), dtype=np.int64))
+        size = len(self.codes)
+        self.sums = np.concatenate([self.sums, np.zeros(size - len(self.sums))]) + np.bincount(codes, weights=values, minlength=size)
+        self.maxs = np.concatenate([self.maxs, np.full(size - len(self.maxs), -np.inf)])
+        np.maximum.at(self.maxs, codes, values)
+
+    def add_failures(self, codes, failed):
+        keys = np.asarray(codes, dtype=np.int64) * 2 + (np.asarray(failed) != 0)
+        self.failure_keys, self.failure_counts = merge_counts(self.failure_keys, self.failure_counts, keys, np.ones(len(keys), dtype=np.int64))
+
+    def to_frame(self):
+        stat_columns = ['Requests', 'HTTP Codes Fail', 'Failure Rate', 'Mean Response Time', 'Median Response Time', 'P90 Response Time', 'P99 Response Time', 'Max Response Time']
+        if len(self.latency_keys) == 0:
+            return pd.DataFrame(columns=self.tag_keys + stat_columns)
+        key_groups = self.latency_keys // self.bucket_count
+        groups = np.unique(key_groups)
+        requests = np.bincount(np.searchsorted(groups, key_groups), weights=self.latency_counts, minlength=len(groups)).astype(np.int64)
+
+        failure_groups = self.failure_keys // 2
+        known = np.isin(failure_groups, groups)
+        positions = np.searchsorted(groups, failure_groups[known])
+        checked = np.bincount(positions, weights=self.failure_counts[known], minlength=len(groups))
+        failed = np.bincount(positions, weights=self.failure_counts[known] * (self.failure_keys[known] % 2), minlength=len(groups)).astype(np.int64)
+
+        # Tag columns are categorical, so they are stored dictionary-encoded in the Arrow file
+        tag_values = list(self.codes)
+        frame = pd.DataFrame({key: pd.Categorical([tag_values[group][i] for group in groups]) for i, key in enumerate(self.tag_keys)})
+        frame['Requests'] = requests
+        frame['HTTP Codes Fail'] = failed
+        frame['Failure Rate'] = np.divide(failed, checked, out=np.full(len(groups), np.nan), where=checked > 0)
+        frame['Mean Response Time'] = self.sums[groups] / requests
+        frame['Median Response Time'] = grouped_quantiles(self.sketch, self.latency_keys, self.latency_counts, groups, 0.5)
+        frame['P90 Response Time'] = grouped_quantiles(self.sketch, self.latency_keys, self.latency_counts, groups, 0.9)
+        frame['P99 Response Time'] = grouped_quantiles(self.sketch, self.latency_keys, self.latency_counts, groups, 0.99)
+        frame['Max Response Time'] = self.maxs[groups]
+        return frame.sort_values(self.tag_keys, ignore_index=True)
+
+class ThreadedReader:
+    # readinto() over the blocks a background thread decompresses from stream, so decompression overlaps with the
+    # parsing of the previous block. zlib and zstandard release the GIL while they decompress. The thread fills a
+    # fixed set of reused buffers, a fresh buffer per block would cost as much as the decompression itself.
+    def __init__(self, stream, chunk_size=CHUNK_SIZE):
+        self.stream = stream
+        self.free = queue.Queue()
+        for _ in range(DECOMPRESSED_BLOCKS):
+            self.free.put(bytearray(chunk_size))
+        self.blocks = queue.Queue()
+        self.buffer, self.start, self.end = None, 0, 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.decompress, daemon=True)
+        self.thread.start()
+
+    def decompress(self):
+        try:
+            while True:
+                buffer = self.free.get()
+                if self.stopped.is_set():
+                    return
+                read = self.stream.readinto(buffer)
+                self.blocks.put((buffer, read))
+                if not read:
+                    return
+        except Exception as error:
+            self.blocks.put(error)
+
+    def readinto(self, view):
+        while self.start == self.end:
+            if self.buffer is not None:
+                self.free.put(self.buffer)
+            block = self.blocks.get()
+            if isinstance(block, Exception):
+                raise block
+            self.buffer, self.end = block
+            self.start = 0
+            if not self.end:
+                self.blocks.put(block)  # Later calls keep returning the end of the file
+                self.buffer = None
+                return 0
+        size = min(len(view), self.end - self.start)
+        view[:size] = memoryview(self.buffer)[self.start:self.start + size]
+        self.start += size
+        return size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        # A thread waiting for a free buffer is released when the parser stopped before the end of the file
+        self.stopped.set()
+        self.free.put(None)
+        self.thread.join()
+        self.stream.close()
+
+def open_report(json_path):
+    # .json.gz and .json.zst reports are decompressed while they are read, plain reports are read without buffering
+    if json_path.endswith('.gz'):
+        return ThreadedReader(gzip.open(json_path, 'rb'))
+    if json_path.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(f"Reading {json_path} needs the zstandard package, install it with pip install zstandard") from None
+        return ThreadedReader(zstandard.ZstdDecompressor().stream_reader(open(json_path, 'rb'), read_size=1024 * 1024, read_across_frames=True, closefd=True))
+    return open(json_path, 'rb', buffering=0)
+
+def iter_blocks(json_path, chunk_size=CHUNK_SIZE):
+    # Yield (buffer, end) pairs where buffer[:end] holds complete lines only. The same buffer is reused
+    # for every block and the partial last line is moved to its front before reading the next block.
+    buffer = bytearray(chunk_size)
+    filled = 0
+    with open_report(json_path) as f:
+        while True:
+            if filled == len(buffer):
+                buffer.extend(bytearray(len(buffer)))  # A single line is longer than the buffer
+            with memoryview(buffer) as view:
+                read = f.readinto(view[filled:])
+            if not read:
+                if filled:
+                    yield buffer, filled
+                return
+            filled += read
+            cut = buffer.rfind(b'\n', 0, filled) + 1
+            if cut:
+                yield buffer, cut
+                buffer[:filled - cut] = buffer[cut:filled]
+                filled -= cut
+
+def iter_mapped_blocks(json_path, chunk_size=CHUNK_SIZE):
+    # Yield (view, end) pairs of zero-copy views of the memory-mapped report, each ending after a complete line
+    with open(json_path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    # The arrays built on the views may outlive the loop, so the map is closed once the last of them is released
+    start = 0
+    while start < len(data):
+        cut = data.rfind(b'\n', start, start + chunk_size) + 1
+        if cut <= start:
+            # A single line is longer than the chunk, or the last line has no line break
+            cut = data.find(b'\n', start + chunk_size) + 1 or len(data)
+        yield memoryview(data)[start:cut], cut - start
+        start = cut
+
+def k6_points(raw, names):
+    # Offsets of the time of every Point of the metrics in names, one array per name. None when a line of the block
+    # neither begins with the "metric" key, like the Point lines k6 writes, nor is a Metric definition, or when a line
+    # of one of the metrics is neither a Point nor its Metric definition.
+    # The block is read LINE_SEARCH_BYTES at a time and the lines of every piece are checked while it is still in
+    # the CPU cache, a pass over the whole block per check would wait on memory for every line.
+    keys = {name: METRIC_KEY + name.encode() + b'"' for name in names}
+    offsets = {name: [] for name in names}
+    mask = np.zeros(min(LINE_SEARCH_BYTES, len(raw)) + 8, dtype=bool)
+    for start in range(0, len(raw), LINE_SEARCH_BYTES):
+        piece = raw[start:start + LINE_SEARCH_BYTES]
+        np.equal(piece, ord('\n'), out=mask[:len(piece)])
+        mask[len(piece):] = False
+        starts = sparse_nonzero(mask[:(len(piece) + 7) // 8 * 8]) + (start + 1)
+        if start == 0:
+            starts = np.concatenate([[0], starts])
+        starts = starts[:np.searchsorted(starts, len(raw))]
+        # The third byte tells the lines that begin with the "metric" key from the Metric definitions, the whole key
+        # is compared with the name of the metric
+        first = raw[np.minimum(starts + 2, len(raw) - 1)] == METRIC_KEY[2]
+        others = starts[~first]
+        others = others[raw[others] != ord('\n')]  # Empty lines
+        if not matches(raw, others, DEFINITION_PREFIX).all():
+            return None
+        starts = starts[first]
+        for name, key in keys.items():
+            # The end of the key singles out the lines of the metric before the key and the Point layout after it
+            # are compared in one go
+            lines = starts[matches(raw, starts + (len(key) - 8), key[-8:])]
+            is_point = matches(raw, lines, key[:-1] + POINT_KEY)
+            definitions = lines[~is_point]
+            definitions = definitions[matches(raw, definitions, key)]
+            if not matches(raw, definitions + (len(key) - 1), DEFINITION_KEY).all():
+                return None
+            offsets[name].append(lines[is_point] + (len(key) - 1 + len(POINT_KEY)))
+    return {name: np.concatenate(name_offsets) if name_offsets else np.empty(0, dtype=np.int64) for name, name_offsets in offsets.items()}
+
+def sparse_nonzero(mask):
+    # np.flatnonzero of a mask with few True values and a length multiple of 8. The mask is read as 8-byte words and
+    # only the words holding a True value are searched byte by byte, about 2.5 times faster for the line breaks of a block.
+    words = np.flatnonzero(mask.view(np.uint64) != 0)
+    found = np.flatnonzero(np.take(mask.reshape(-1, 8), words, axis=0))
+    return words[found >> 3] * 8 + (found & 7)
+
+def matches(raw, offsets, key):
+    # Whether key is at every offset of the block (offsets in ascending order), compared 8 bytes at a time through an
+    # unaligned uint64 view of the block, one lookup per offset and 8 bytes of key. Keys that would pass the end of
+    # the block do not match.
+    if len(offsets) == 0:
+        return np.ones(0, dtype=bool)
+    if len(key) < 8 or offsets[-1] > len(raw) - len(key):
+        return (gather(raw, offsets, len(key)) == np.frombuffer(key, dtype=np.uint8)).all(axis=1)
+    words = np.ndarray((len(raw) - 7,), dtype='<u8', buffer=raw, strides=(1,))
+    found = None
+    for position in [*range(0, len(key) - 8, 8), len(key) - 8]:
+        same = words[offsets + position] == np.frombuffer(key, dtype='<u8', count=1, offset=position)[0]
+        found = same if found is None else found & same
+    return found
+
+def gather(raw, starts, width):
+    # width bytes from every start offset, one row per offset. Rows are taken from a sliding window view of the
+    # block, so no index is built per byte. Bytes past the end of the block are zeros.
+    last = len(raw) - width
+    if last >= 0 and (len(starts) == 0 or starts.max() <= last):
+        return np.lib.stride_tricks.sliding_window_view(raw, width)[starts]
+    tail_start = max(last, 0)
+    tail = np.concatenate([raw[tail_start:], np.zeros(width, dtype=np.uint8)])
+    inside = starts <= last
+    rows = np.empty((len(starts), width), dtype=np.uint8)
+    if inside.any():
+        rows[inside] = np.lib.stride_tricks.sliding_window_view(raw, width)[starts[inside]]
+    rows[~inside] = np.lib.stride_tricks.sliding_window_view(tail, width)[starts[~inside] - tail_start]
+    return rows
+
+def delimited(raw, starts, chars, width, lengths_only=False):
+    # Fields of the block from every start offset to the first of chars, as a NumPy bytes array that NumPy parses to
+    # numbers or strings in one call, and their lengths (-1 when none of chars is in the next width bytes). With
+    # lengths_only the fields are not cut to their lengths and None is returned instead.
+    fields = gather(raw, starts, width)
+    found = fields == chars[0]
+    for char in chars[1:]:
+        found |= fields == char
+    lengths = found.argmax(axis=1)
+    lengths[~found[np.arange(len(lengths)), lengths]] = -1
+    if lengths_only:
+        return None, lengths
+    fields *= np.arange(width) < lengths[:, np.newaxis]
+    return fields.view(f'S{width}').ravel(), lengths
+
+def scan_points(raw, time_starts, keep_times):
+    # Values (and times) of the Points of a metric from the offsets of their times found by k6_points, read straight
+    # from the bytes of the block. None when a Point does not have its value after the time, the block is then decoded
+    # with orjson.
+    if keep_times:
+        times, time_lengths = delimited(raw, time_starts, b'"', TIME_WIDTH)
+    else:
+        _, time_lengths = delimited(raw, time_starts + TIME_DATE_BYTES, b'"', TIME_WIDTH - TIME_DATE_BYTES, lengths_only=True)
+        time_lengths = np.where(time_lengths < 0, -1, time_lengths + TIME_DATE_BYTES)
+    value_starts = time_starts + time_lengths + len(VALUE_KEY)
+    values, value_lengths = delimited(raw, value_starts, b',}', VALUE_WIDTH)
+    if np.any(time_lengths < 0) or np.any(value_lengths <= 0) or not matches(raw, time_starts + time_lengths, VALUE_KEY).all():
+        return None
+    return values.astype(np.float64), times.astype(str) if keep_times else None
+
+def decode_points(block, end, marker, keep_times, tag_groups):
+    # Values, times and tag group codes of the Points of a metric, only the lines that contain its marker are decoded
+    values = []
+    times = []
+    codes = []
+    for line in iter_marked_lines(block, end, marker):
+        entry = orjson.loads(line)
+        if entry['type'] == 'Point':
+            values.append(entry['data']['value'])
+            if keep_times:
+                times.append(entry['data']['time'])
+            if tag_groups is not None:
+                codes.append(tag_groups.code(entry['data'].get('tags') or {}))
+    return np.asarray(values, dtype=np.float64), times, codes
+
+def iter_marked_lines(block, end, marker):
+    # Yield only the lines of block[:end] that contain the marker, the search itself runs in C
+    pos = block.find(marker, 0, end)
+    while pos != -1:
+        start = block.rfind(b'\n', 0, pos) + 1
+        line_end = block.find(b'\n', pos, end)
+        if line_end == -1:
+            line_end = end
+        yield block[start:line_end]
+        pos = block.find(marker, line_end, end)
+
+def process_json_file(json_path, metrics=DEFAULT_METRICS, keep_samples=True, relative_error=SKETCH_RELATIVE_ERROR, timeline_seconds=None, tag_keys=None, trim=None, mapped=False, reservoir=None):
+    # Every metric in metrics is collected while the file is read once: the values and times of the Points of every
+    # metric are parsed straight from the bytes of each block with NumPy, only blocks whose lines do not follow the
+    # k6 layout are searched for the marker of every metric and the matching lines decoded with orjson.
+    # With mapped an uncompressed report is memory-mapped instead of copied block by block into a buffer.
+    # With keep_samples=False only sketches are filled, so memory stays constant and the
+    # median/P90/P99 come from the sketches instead of the exact samples.
+    # With timeline_seconds the Point timestamps are also kept, aggregated in windows of that length.
+    # With tag_keys the requests and failures are also split by the values of those tags.
+    # With trim the statistics are also computed without the leading/trailing seconds or outside the steady state,
+    # from per-second sketches filled in the same pass.
+    # With reservoir, a [size, window seconds or None] pair, a fixed-size sample of the durations is also kept for the plots.
+    collectors = {name: MetricCollector(kind, keep_samples, relative_error) for name, kind in metrics.items()}
+    markers = {name: metric_marker(name) for name in metrics}
+    timeline = Timeline(timeline_seconds, relative_error) if timeline_seconds else None
+    tag_groups = TagGroups(tag_keys, relative_error) if tag_keys else None
+    steady = Timeline(TRIM_WINDOW_SECONDS, relative_error) if trim else None
+    sampled = Reservoir(*reservoir) if reservoir else None
+    stratified = sampled is not None and sampled.window_ns is not None
+
+    # The tags are only available by decoding the lines, so --group-by-tags decodes the lines of every block
+    scanned = not tag_keys
+    mapped = mapped and scanned and not json_path.endswith(('.gz', '.zst'))
+    for block, end in (iter_mapped_blocks(json_path) if mapped else iter_blocks(json_path)):
+        if scanned:
+            raw = np.frombuffer(block, dtype=np.uint8, count=end)
+            points_offsets = k6_points(raw, collectors)
+            text = None  # Copy of a mapped block for orjson, only made when a metric needs it
+        for name, collector in collectors.items():
+            keep_times = (timeline is not None or steady is not None or (stratified and name == 'http_req_duration')) and name in DEFAULT_METRICS
+            keep_tags = tag_groups is not None and name in DEFAULT_METRICS
+            points = scan_points(raw, points_offsets[name], keep_times) if scanned and points_offsets is not None else None
+            if points is not None:
+                values, times = points
+            elif mapped:
+                text = bytes(block[:end]) if text is None else text
+                values, times, codes = decode_points(text, end, markers[name], keep_times, None)
+            else:
+                values, times, codes = decode_points(block, end, markers[name], keep_times, tag_groups if keep_tags else None)
+            collector.add(values)
+
+            if keep_times:
+                times = parse_timestamps(times)
+                for windowed in (timeline, steady):
+                    if windowed is None:
+                        continue
+                    if name == 'http_req_duration':
+                        windowed.add_durations(times, values)
+                    else:
+                        windowed.add_failures(times, values)
+            if sampled is not None and name == 'http_req_duration':
+                sampled.add(values, times if stratified else None)
+            if keep_tags and name == 'http_req_duration':
+                tag_groups.add_durations(codes, values)
+            elif keep_tags:
+                tag_groups.add_failures(codes, values)
+        raw = None  # iter_blocks cannot grow its buffer while an array still uses it
+
+    durations = collectors['http_req_duration']
+    failures = collectors['http_req_failed']
+    response_times = durations.samples.values() if keep_samples else None
+    reservoir_times = sampled.values() if sampled else None
+    timeline_df = timeline.to_frame() if timeline else None
+    tag_groups_df = tag_groups.to_frame() if tag_groups else None
+    metric_stats = [collectors[name].stats()[stat] for name, kind in metrics.items() if name not in DEFAULT_METRICS for stat in METRIC_STATS[kind]]
+
+    if durations.count == 0:
+        return [None] * 9 + metric_stats + [None] * len(trim_columns(trim)) + [response_times, reservoir_times, timeline_df, tag_groups_df, durations.sketch.to_dict()]
+
+    duration_stats = durations.stats()
+    http_codes_200 = failures.count - failures.nonzero
+    http_codes_fail = failures.nonzero
+    trim_stats = trimmed_stats(steady, trim) if trim else []
+
+    return [duration_stats[stat] for stat in METRIC_STATS['trend']] + [http_codes_200, http_codes_fail] + metric_stats + trim_stats + [response_times, reservoir_times, timeline_df, tag_groups_df, durations.sketch.to_dict()]
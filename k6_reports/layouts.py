@@ -0,0 +1,45 @@
+import os
+import re
+
+from .plots import average_per_architecture_rps, plot_architecture_rps, plot_scenario_vu
+
+# Layout profiles map the path of a k6 report to its metadata. pattern is searched at the end of the report path and
+# every field is one of its named groups: the partition key used in the samples/timelines/tag_groups datasets, its
+# results.xlsx column and the type of its value. The last field is the load level of the report (RPS or VUs).
+# summarize adds columns to results_df before results.xlsx is written and plot draws the images of the layout.
+LAYOUTS = {
+    # chapter5-lambda-monolith-migration-benchmark/<scenario>/<architecture>/k6-load-test-<architecture>/<run>/k6-report-...-<rps>rps.js.json
+    'architecture-rps': {
+        'pattern': r'(?P<architecture>[^/]+)/[^/]+/(?P<run>[^/]+)/[^/]*-(?P<rps>\d+)rps[^/-]*$',
+        'fields': [('architecture', 'Architecture', str), ('run', 'Test Run', str), ('rps', 'RPS (Requests per Second)', int)],
+        'summarize': average_per_architecture_rps,
+        'plot': plot_architecture_rps,
+    },
+    # chapter3-openfaas-monolith-benchmark/<scenario>/<architecture>/k6-load-test/<environment>/<run>/k6-report-...-<vu>vu.js.json
+    'scenario-vu': {
+        'pattern': r'(?P<scenario>[^/]+)/(?P<architecture>[^/]+)/[^/]+/(?P<environment>[^/]+)/(?P<run>[^/]+)/[^/]*-(?P<vu>\d+)vu[^/-]*$',
+        'fields': [('scenario', 'Scenario', str), ('architecture', 'Architecture', str), ('environment', 'Environment', str),
+                   ('run', 'Test Run', str), ('vu', 'VU (Virtual Users)', int)],
+        'summarize': None,
+        'plot': plot_scenario_vu,
+    },
+}
+
+def extract_metadata(json_path, layout):
+    # (partition key, value) pairs of a report, None when its path does not follow the layout
+    match = re.search(layout['pattern'], json_path.replace(os.sep, '/'))
+    if match is None:
+        return None
+    return [(key, convert(match.group(key))) for key, column, convert in layout['fields']]
+
+def key_columns(layout):
+    # Columns that identify a report in results.xlsx
+    return [column for key, column, convert in layout['fields']]
+
+def load_column(layout):
+    return layout['fields'][-1][1]
+
+def layout_columns(layout):
+    # Metadata columns of results.xlsx, the load level goes after the File column
+    columns = key_columns(layout)
+    return columns[:-1] + ['File', columns[-1]]
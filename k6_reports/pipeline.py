@@ -0,0 +1,137 @@
+import os
+import orjson
+import pandas as pd
+from tqdm import tqdm
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .engine import metric_columns, trim_columns, process_json_file
+from .datasets import samples_file, reservoir_file, timeline_file, tag_groups_file, write_samples, write_frame, load_frame
+from .layouts import LAYOUTS, extract_metadata, layout_columns, load_column
+
+STAT_COLUMNS = ['Request Count', 'Min Response Time', 'Max Response Time', 'Mean Response Time', 'Median Response Time',
+                'P90 Response Time', 'P99 Response Time', 'HTTP Codes 200', 'HTTP Codes Fail']
+
+STAT_COLUMN_TYPES = {'Request Count': 'Int64', 'Min Response Time': 'float64', 'Max Response Time': 'float64', 'Mean Response Time': 'float64',
+                     'Median Response Time': 'float64', 'P90 Response Time': 'float64', 'P99 Response Time': 'float64',
+                     'HTTP Codes 200': 'Int64', 'HTTP Codes Fail': 'Int64'}
+
+FILE_COLUMNS = ['Samples File', 'Reservoir File', 'Timeline File', 'Tag Groups File', 'Latency Sketch']
+
+def result_columns(options):
+    return layout_columns(LAYOUTS[options['layout']]) + STAT_COLUMNS + metric_columns(options['metrics']) + trim_columns(options['trim']) + FILE_COLUMNS
+
+def result_column_types(options):
+    return {load_column(LAYOUTS[options['layout']]): 'int64', **STAT_COLUMN_TYPES,
+            **{column: 'float64' for column in metric_columns(options['metrics']) + trim_columns(options['trim'])}}
+
+def process_file(json_file, folder_path, options, mapped=False):
+    # mapped only changes how the report is read, not the row, so it is not one of the cached options
+    relative_path = os.path.relpath(json_file, folder_path)
+    stats = process_json_file(json_file, metrics=options['metrics'], keep_samples=not options['sketch'], relative_error=options['sketch_error'], timeline_seconds=options['timeline'], tag_keys=options['tags'], trim=options['trim'], mapped=mapped, reservoir=options['reservoir'])
+    if stats is not None:
+        keys = extract_metadata(json_file, LAYOUTS[options['layout']])
+        response_times, reservoir_times, timeline_df, tag_groups_df, sketch = stats[-5:]
+        sample_path = None
+        if response_times is not None:
+            sample_path = samples_file(keys)
+            write_samples(os.path.join(folder_path, sample_path), response_times)
+        reservoir_path = None
+        if reservoir_times is not None:
+            reservoir_path = reservoir_file(keys)
+            write_samples(os.path.join(folder_path, reservoir_path), reservoir_times)
+        timeline_path = None
+        if timeline_df is not None:
+            timeline_path = timeline_file(keys)
+            write_frame(os.path.join(folder_path, timeline_path), timeline_df)
+        tag_groups_path = None
+        if tag_groups_df is not None:
+            tag_groups_path = tag_groups_file(keys)
+            write_frame(os.path.join(folder_path, tag_groups_path), tag_groups_df)
+        # The load level (RPS or VUs) goes after the File column
+        metadata = [value for key, value in keys]
+        return metadata[:-1] + [relative_path, metadata[-1]] + stats[:-5] + [sample_path, reservoir_path, timeline_path, tag_groups_path, sketch]
+    return None
+
+def process_files(json_files, folder_path, jobs, options, mapped=False):
+    if jobs == 1:
+        return [process_file(json_file, folder_path, options, mapped) for json_file in tqdm(json_files, desc="Processing JSON files")]
+
+    # Results are stored by input position, so the merge order does not depend on which worker finishes first.
+    # The largest reports are submitted first to keep every worker busy until the end.
+    results = [None] * len(json_files)
+    submission_order = sorted(range(len(json_files)), key=lambda i: os.path.getsize(json_files[i]), reverse=True)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(process_file, json_files[i], folder_path, options, mapped): i for i in submission_order}
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Processing JSON files"):
+            results[futures[future]] = future.result()
+    return results
+
+# Per-report cache of the computed rows, stored next to results.xlsx. An entry is reused while the report keeps
+# the same size and mtime, it was processed with the same options and its samples, reservoir, timeline and tag groups files still exist.
+# Bump CACHE_VERSION whenever the row layout changes.
+CACHE_FILE = '.k6-reports-cache.json'
+CACHE_VERSION = 8
+
+def report_fingerprint(json_file):
+    stat = os.stat(json_file)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def load_cache(cache_path):
+    if not os.path.exists(cache_path):
+        return {}
+    with open(cache_path, 'rb') as f:
+        cache = orjson.loads(f.read())
+    if cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache['reports']
+
+def save_cache(cache_path, reports):
+    # Written to a temporary file first, so an interrupted run never leaves a truncated cache behind
+    temp_path = cache_path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(orjson.dumps({'version': CACHE_VERSION, 'reports': reports}, option=orjson.OPT_SERIALIZE_NUMPY))
+    os.replace(temp_path, cache_path)
+
+def is_cache_entry_valid(entry, fingerprint, options, folder_path):
+    # The samples, reservoir, timeline and tag groups files are the four columns before the sketch
+    files = [path for path in entry['row'][-5:-1] if path is not None]
+    return entry['fingerprint'] == fingerprint and entry['options'] == options and all(os.path.exists(os.path.join(folder_path, path)) for path in files)
+
+def process_files_cached(json_files, folder_path, jobs, options, use_cache=True, mapped=False):
+    # Only new or changed reports are parsed, the rows of every other report come from the cache
+    cache_path = os.path.join(folder_path, CACHE_FILE)
+    cache = load_cache(cache_path) if use_cache else {}
+
+    rows = [None] * len(json_files)
+    fingerprints = [report_fingerprint(json_file) for json_file in json_files]
+    pending = []
+    for i, json_file in enumerate(json_files):
+        entry = cache.get(os.path.relpath(json_file, folder_path))
+        if entry is not None and is_cache_entry_valid(entry, fingerprints[i], options, folder_path):
+            rows[i] = entry['row']
+        else:
+            pending.append(i)
+
+    print(f"Reusing {len(json_files) - len(pending)} cached reports, processing {len(pending)}")
+    for i, row in zip(pending, process_files([json_files[i] for i in pending], folder_path, jobs, options, mapped)):
+        rows[i] = row
+
+    # Reports that no longer exist are dropped from the cache
+    save_cache(cache_path, {os.path.relpath(json_file, folder_path): {'fingerprint': fingerprint, 'options': options, 'row': row}
+                            for json_file, fingerprint, row in zip(json_files, fingerprints, rows) if row is not None})
+    return rows
+
+def build_results_df(rows, columns, column_types):
+    # Build the DataFrame once from the collected rows, with typed columns, instead of concatenating one frame per file
+    results_df = pd.DataFrame([row for row in rows if row is not None], columns=columns)
+    return results_df.astype(column_types)
+
+def build_tag_groups_df(results_df, folder_path, key_columns):
+    # One row per report and combination of tag values, prefixed with the key_columns of the report
+    frames = [load_frame(os.path.join(folder_path, row['Tag Groups File'])).assign(**{column: row[column] for column in key_columns})
+              for index, row in results_df.dropna(subset=['Tag Groups File']).iterrows()]
+    if not frames:
+        return None
+    tag_groups_df = pd.concat(frames, ignore_index=True)
+    return tag_groups_df[key_columns + [column for column in tag_groups_df.columns if column not in key_columns]]
+
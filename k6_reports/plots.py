@@ -0,0 +1,333 @@
+import os
+import hashlib
+import orjson
+import matplotlib
+matplotlib.use('Agg')  # Figures are only saved to files, never shown, so no GUI backend is loaded in any process
+import pandas as pd
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.colors import LogNorm
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .sketch import LatencySketch, merge_sketches
+from .datasets import load_samples
+
+# Largest number of points drawn per series of a latency scatter, longer series are uniformly downsampled
+MAX_SCATTER_POINTS = 20000
+
+# Largest number of latency bins of the density plots, adjacent sketch buckets are merged to stay below it
+DENSITY_BINS = 120
+
+# Digests of the figures drawn in a folder, stored next to results.xlsx. A figure is only drawn again when the digest of
+# its drawing function and arguments changes or its image is missing. Bump PLOT_CACHE_VERSION whenever a drawing function changes.
+PLOT_CACHE_FILE = '.k6-reports-plots.json'
+PLOT_CACHE_VERSION = 1
+
+# Define a custom sorting key function
+def custom_sort_key(label):
+    if label.endswith('1000 RPS'):
+        return 1001  # Ensure '1000 RPS' comes after '800 RPS'
+    else:
+        return int(label.split()[0])  # Extract the RPS value and convert to integer for sorting
+
+def update_digest(digest, value):
+    # Feed a figure argument to the hash. Arrow files (the samples dataset) are identified by their size and mtime,
+    # they are rewritten whenever their report is processed again.
+    if isinstance(value, pd.DataFrame):
+        update_digest(digest, [str(column) for column in value.columns])
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(f'{value.dtype}{value.shape}'.encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value):
+            update_digest(digest, key)
+            update_digest(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f'[{len(value)}'.encode())
+        for item in value:
+            update_digest(digest, item)
+    elif isinstance(value, str) and value.endswith('.arrow') and os.path.exists(value):
+        stat = os.stat(value)
+        digest.update(f'{value}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+    else:
+        digest.update(repr(value.item() if isinstance(value, np.generic) else value).encode())
+    digest.update(b';')
+
+def figure_digest(function, kwargs):
+    digest = hashlib.sha256(f'{PLOT_CACHE_VERSION}:{matplotlib.__version__}:{function.__module__}.{function.__qualname__}'.encode())
+    update_digest(digest, kwargs)
+    return digest.hexdigest()
+
+def load_plot_cache(cache_path):
+    if not os.path.exists(cache_path):
+        return {}
+    with open(cache_path, 'rb') as f:
+        cache = orjson.loads(f.read())
+    if cache.get('version') != PLOT_CACHE_VERSION:
+        return {}
+    return cache['figures']
+
+def save_plot_cache(cache_path, figures):
+    temp_path = cache_path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(orjson.dumps({'version': PLOT_CACHE_VERSION, 'figures': figures}))
+    os.replace(temp_path, cache_path)
+
+def render_changed_figures(figures, folder_path, jobs=1, use_cache=True):
+    # Only the figures whose data or styling changed since the previous run are drawn, the digests of the figures
+    # left out of this run are dropped from the cache
+    cache_path = os.path.join(folder_path, PLOT_CACHE_FILE)
+    cache = load_plot_cache(cache_path) if use_cache else {}
+    digests = {os.path.relpath(kwargs['path'], folder_path): figure_digest(function, kwargs) for function, kwargs in figures}
+    changed = [(function, kwargs) for function, kwargs in figures
+               if cache.get(os.path.relpath(kwargs['path'], folder_path)) != digests[os.path.relpath(kwargs['path'], folder_path)] or not os.path.exists(kwargs['path'])]
+    print(f"Generating {len(changed)} images, {len(figures) - len(changed)} unchanged")
+    render_figures(changed, jobs)
+    save_plot_cache(cache_path, digests)
+
+def render_figures(figures, jobs=1):
+    # figures is a list of (function, kwargs) pairs, each function draws and saves one figure. Figures are independent,
+    # so with jobs > 1 they are rendered by a pool of worker processes.
+    if jobs == 1 or len(figures) <= 1:
+        for function, kwargs in figures:
+            function(**kwargs)
+        return
+    with ProcessPoolExecutor(max_workers=min(jobs, len(figures))) as executor:
+        for future in as_completed([executor.submit(function, **kwargs) for function, kwargs in figures]):
+            future.result()
+
+def downsample(values, max_points, seed=0):
+    # Uniform sample of at most max_points values, in their original order
+    if len(values) <= max_points:
+        return values
+    return values[np.sort(np.random.default_rng(seed).choice(len(values), max_points, replace=False))]
+
+def draw_rps_points(path, architecture, rps_labels, values, marker, va, ylabel):
+    # One point per RPS level, drawn with a single plot call: every column of the 2D arrays is its own line
+    fig, ax = plt.subplots(figsize=(10, 10))
+    positions = np.arange(len(rps_labels))
+    ax.plot(positions[np.newaxis, :], values[np.newaxis, :], marker=marker, label=[f"{architecture} ({rps} RPS)" for rps in rps_labels])
+    for position, value in zip(positions, values):
+        ax.text(position, value, f"{value:.2f}", ha='center', va=va)
+    ax.set_xticks(positions, rps_labels)
+    ax.set_xlabel('RPS (Requests per Second)')
+    ax.set_ylabel(ylabel)
+    ax.legend(loc='center left', bbox_to_anchor=(1, 0.5))
+    ax.grid(True)
+    fig.subplots_adjust(left=0.1, right=0.75, bottom=0.1, top=0.9)
+    fig.savefig(path, bbox_inches='tight')
+    plt.close(fig)
+
+def draw_latency_scatter(path, architecture, series):
+    # series is a list of (rps, samples files) pairs, the samples of every run of an RPS level are drawn in one call
+    fig, ax = plt.subplots(figsize=(10, 10))
+    for rps, sample_paths in series:
+        response_times = downsample(np.concatenate([load_samples(sample_path) for sample_path in sample_paths]), MAX_SCATTER_POINTS)
+        ax.scatter(np.full(len(response_times), rps), response_times, label=f"{architecture} ({rps} RPS)", alpha=0.6, rasterized=True)
+    ax.set_xlabel('RPS (Requests per Second)')
+    ax.set_ylabel('Response Time in ms')
+    ax.legend(loc='center left', bbox_to_anchor=(1, 0.5))
+    ax.grid(True)
+    fig.subplots_adjust(left=0.1, right=0.75, bottom=0.1, top=0.9)
+    fig.savefig(path, bbox_inches='tight')
+    plt.close(fig)
+
+def draw_vu_bars(path, scenario, environment, metric, group):
+    fig, ax = plt.subplots(figsize=(18, 10))
+
+    # Plot each architecture using horizontal bars
+    bar_width = 0.8
+    spacing = 0.1
+    for i, (architecture, arch_group) in enumerate(group.groupby('Architecture', sort=False)):
+        # Calculate the offset for each architecture
+        offset = i * (bar_width + spacing)
+
+        # Create horizontal bar plot with larger bars, every bar annotated with its X value
+        bars = ax.barh(arch_group['VU (Virtual Users)'] + offset, arch_group[metric], bar_width, label=architecture, alpha=0.7)
+        ax.bar_label(bars, fmt='%.2f', fontsize=12)
+
+    ax.set_xlabel(f'{metric} in ms', fontsize=12)  # Increase X-axis label font size
+    ax.set_ylabel('VU (Virtual Users)', fontsize=12)  # Increase Y-axis label font size
+    ax.set_title(f'{metric} for Scenario: {scenario}, Environment: {environment}', fontsize=16)  # Increase title font size
+    ax.legend(loc='best', fontsize=12)  # Increase legend font size
+    ax.grid(True, which='both', linestyle='--', linewidth=0.5)
+
+    # Ensure Y-axis only has integer values (for VU)
+    ax.yaxis.set_major_locator(plt.MaxNLocator(integer=True))
+
+    # Set the Y-axis ticks to only those VUs that have data
+    ax.set_yticks(group['VU (Virtual Users)'].unique())
+
+    fig.savefig(path, bbox_inches='tight')
+    plt.close(fig)
+
+def density_bins(sketches, max_bins=DENSITY_BINS):
+    # Common log-spaced bins over the non-empty buckets of every sketch: bin edges in ms and the counts of each sketch.
+    # Only bucket counts are used, so the cost does not depend on the number of samples.
+    nonzero = [np.flatnonzero(sketch.counts) for sketch in sketches if sketch.count]
+    low = min(indexes[0] for indexes in nonzero)
+    high = max(indexes[-1] for indexes in nonzero)
+    factor = max(1, int(np.ceil((high - low + 1) / max_bins)))
+    bins = (high - low) // factor + 1
+    positions = np.arange(high - low + 1) // factor
+    counts = np.array([np.bincount(positions, weights=sketch.counts[low:high + 1], minlength=bins) for sketch in sketches])
+    # Bucket i of a sketch holds the values in (gamma^(i + offset - 1), gamma^(i + offset)]
+    edges = sketches[0].gamma ** (low + np.arange(bins + 1) * factor + sketches[0].offset - 1)
+    return edges, counts
+
+def draw_latency_heatmap(path, title, level_label, levels, sketch_dicts):
+    # One column per load level, colored by the share of its requests in each latency bin
+    sketches = [LatencySketch.from_dict(data) for data in sketch_dicts]
+    edges, counts = density_bins(sketches)
+    shares = counts / np.maximum(counts.sum(axis=1, keepdims=True), 1)
+    fig, ax = plt.subplots(figsize=(10, 10))
+    mesh = ax.pcolormesh(np.arange(len(levels) + 1) - 0.5, edges, np.ma.masked_equal(shares.T, 0), norm=LogNorm(), cmap='viridis')
+    fig.colorbar(mesh, ax=ax, label='Share of requests')
+    ax.set_yscale('log')
+    ax.set_xticks(np.arange(len(levels)), levels)
+    ax.set_xlabel(level_label)
+    ax.set_ylabel('Response Time in ms')
+    ax.set_title(title)
+    fig.savefig(path, bbox_inches='tight')
+    plt.close(fig)
+
+def draw_latency_violins(path, title, level_label, levels, sketch_dicts):
+    # Violins built from the binned sketch counts instead of the samples, widths are proportional to the requests per log-spaced bin
+    sketches = [LatencySketch.from_dict(data) for data in sketch_dicts]
+    edges, counts = density_bins(sketches)
+    centers = np.sqrt(edges[:-1] * edges[1:])
+    stats = [{'coords': centers, 'vals': bin_counts, 'mean': sketch.mean(), 'median': sketch.quantile(0.5), 'min': sketch.min, 'max': sketch.max}
+             for sketch, bin_counts in zip(sketches, counts)]
+    fig, ax = plt.subplots(figsize=(10, 10))
+    ax.violin(stats, positions=np.arange(len(levels)), widths=0.8, showmeans=True, showmedians=True)
+    ax.set_yscale('log')
+    ax.set_xticks(np.arange(len(levels)), levels)
+    ax.set_xlabel(level_label)
+    ax.set_ylabel('Response Time in ms')
+    ax.set_title(title)
+    ax.grid(True, which='both', linestyle='--', linewidth=0.5)
+    fig.savefig(path, bbox_inches='tight')
+    plt.close(fig)
+
+def draw_latency_ecdf(path, title, level_label, levels, sketch_dicts):
+    # Empirical CDF of every load level, read from the cumulative bucket counts
+    sketches = [LatencySketch.from_dict(data) for data in sketch_dicts]
+    edges, counts = density_bins(sketches)
+    fig, ax = plt.subplots(figsize=(10, 10))
+    for level, bin_counts in zip(levels, counts):
+        ax.step(edges[1:], np.cumsum(bin_counts) / max(bin_counts.sum(), 1), where='post', label=f'{level} {level_label}')
+    for q in (0.5, 0.99):
+        ax.axhline(q, color='grey', linestyle=':', linewidth=1)
+    ax.set_xscale('log')
+    ax.set_xlabel('Response Time in ms')
+    ax.set_ylabel('Share of requests')
+    ax.set_title(title)
+    ax.legend(loc='center left', bbox_to_anchor=(1, 0.5))
+    ax.grid(True, which='both', linestyle='--', linewidth=0.5)
+    fig.savefig(path, bbox_inches='tight')
+    plt.close(fig)
+
+# Density plots that can be requested with --density, they need the latency sketches of the reports
+DENSITY_RENDERERS = {
+    'heatmap': draw_latency_heatmap,
+    'violin': draw_latency_violins,
+    'ecdf': draw_latency_ecdf,
+}
+
+def density_figures(results_df, figure_columns, level_column, level_label, path_prefix, density):
+    # Figure tasks of the requested density plots, one per group of figure_columns with the load levels on the X axis.
+    # Not available when plotting from an existing Excel file, which has no sketches.
+    if not density or 'Latency Sketch' not in results_df.columns:
+        return []
+    figures = []
+    for key, group in results_df.groupby(figure_columns):
+        levels = sorted(group[level_column].unique())
+        sketch_dicts = [merge_sketches(group.loc[group[level_column] == level, 'Latency Sketch']).to_dict() for level in levels]
+        if not any(data['count'] for data in sketch_dicts):
+            continue
+        title = ', '.join(str(value) for value in key)
+        for kind in density:
+            figures.append((DENSITY_RENDERERS[kind], {'path': f'{path_prefix(key)}_latency_{kind}_plot.png', 'title': title, 'level_label': level_label,
+                                                      'levels': [str(level) for level in levels], 'sketch_dicts': sketch_dicts}))
+    return figures
+
+def average_per_architecture_rps(results_df):
+    # Adds the mean/P99 averaged over the runs of every architecture + RPS, and the P99 pooled over all their requests
+    averaged_columns = ['Mean Response Time', 'P99 Response Time']
+    if 'Trimmed P99 Response Time' in results_df.columns:
+        averaged_columns += ['Trimmed Mean Response Time', 'Trimmed P99 Response Time']
+    avg_response_times = results_df.groupby(['Architecture', 'RPS (Requests per Second)'])[averaged_columns].mean().reset_index()
+    avg_response_times.rename(columns={
+        'Mean Response Time': 'Mean Response Time (Average per architecture + RPS)',
+        'P99 Response Time': 'P99 Response Time (Average per architecture + RPS)',
+        'Trimmed Mean Response Time': 'Trimmed Mean Response Time (Average per architecture + RPS)',
+        'Trimmed P99 Response Time': 'Trimmed P99 Response Time (Average per architecture + RPS)'
+    }, inplace=True)
+
+    # True P99 over every request of the architecture + RPS, from the merged sketches of all the runs
+    pooled_p99 = results_df.groupby(['Architecture', 'RPS (Requests per Second)'])['Latency Sketch'].agg(lambda sketches: merge_sketches(sketches).quantile(0.99))
+    avg_response_times = pd.merge(avg_response_times, pooled_p99.rename('P99 Response Time (Pooled per architecture + RPS)').reset_index(), on=['Architecture', 'RPS (Requests per Second)'])
+
+    return pd.merge(results_df, avg_response_times, on=['Architecture', 'RPS (Requests per Second)'], how='left')
+
+def plot_architecture_rps(results_df, folder_path, jobs=1, density=(), use_cache=True):
+    # The averages were merged into every row of results_df by average_per_architecture_rps
+    avg_response_times = results_df.drop_duplicates(subset=['Architecture', 'RPS (Requests per Second)'])
+
+    figures = []
+    for architecture_env, group in avg_response_times.groupby(['Architecture']):
+        architecture_str = architecture_env[0]
+        group = group.sort_values(by='RPS (Requests per Second)', key=lambda x: x.astype(str).map(custom_sort_key))  # Convert to string for sorting
+        rps_labels = group['RPS (Requests per Second)'].astype(str).tolist()
+
+        figures.append((draw_rps_points, {'path': os.path.join(folder_path, f'{architecture_str.replace("/", "_")}_average_mean_plot.png'), 'architecture': architecture_str,
+                                          'rps_labels': rps_labels, 'values': group['Mean Response Time (Average per architecture + RPS)'].to_numpy(), 'marker': 'o', 'va': 'bottom',
+                                          'ylabel': 'Mean Response Time in ms (Average per architecture + RPS)'}))
+        figures.append((draw_rps_points, {'path': os.path.join(folder_path, f'{architecture_str.replace("/", "_")}_p99_plot.png'), 'architecture': architecture_str,
+                                          'rps_labels': rps_labels, 'values': group['P99 Response Time (Average per architecture + RPS)'].to_numpy(), 'marker': 'x', 'va': 'top',
+                                          'ylabel': 'P99 Response Time in ms (Average per architecture + RPS)'}))
+
+    # The reservoir samples are drawn when the reports were processed with --reservoir, otherwise the samples files.
+    # Reports processed with --sketch and without --reservoir have nothing to draw.
+    scatter_files = results_df['Samples File']
+    if 'Reservoir File' in results_df.columns:
+        scatter_files = results_df['Reservoir File'].fillna(scatter_files)
+    for architecture_env, group in results_df.assign(**{'Scatter File': scatter_files}).dropna(subset=['Scatter File']).groupby(['Architecture']):
+        architecture_str = architecture_env[0]
+        series = [(rps, [os.path.join(folder_path, path) for path in rps_group['Scatter File']]) for rps, rps_group in group.groupby('RPS (Requests per Second)')]
+        figures.append((draw_latency_scatter, {'path': os.path.join(folder_path, f'{architecture_str.replace("/", "_")}_all_latency_plot.png'), 'architecture': architecture_str, 'series': series}))
+
+    figures += density_figures(results_df, ['Architecture'], 'RPS (Requests per Second)', 'RPS',
+                               lambda key: os.path.join(folder_path, key[0].replace("/", "_")), density)
+
+    render_changed_figures(figures, folder_path, jobs, use_cache)
+
+def plot_scenario_vu(results_df, folder_path, jobs=1, density=(), use_cache=True):
+    metrics = ['Mean Response Time', 'P99 Response Time', 'Max Response Time']
+
+    # Trimmed statistics are plotted too when the reports were processed (or the Excel file was written) with --trim
+    if 'Trimmed P99 Response Time' in results_df.columns:
+        metrics += ['Trimmed Mean Response Time', 'Trimmed P99 Response Time']
+
+    # Group by scenario, environment, and architecture
+    avg_response_times = results_df.groupby(['Scenario', 'Environment', 'Architecture', 'VU (Virtual Users)'])[metrics].mean().reset_index()
+
+    # True P99 over every request of the group, from the merged sketches of all the runs.
+    # Not available when plotting from an existing Excel file.
+    if 'Latency Sketch' in results_df.columns:
+        pooled_p99 = results_df.groupby(['Scenario', 'Environment', 'Architecture', 'VU (Virtual Users)'])['Latency Sketch'].agg(lambda sketches: merge_sketches(sketches).quantile(0.99))
+        avg_response_times = pd.merge(avg_response_times, pooled_p99.rename('Pooled P99 Response Time').reset_index(), on=['Scenario', 'Environment', 'Architecture', 'VU (Virtual Users)'])
+        metrics.append('Pooled P99 Response Time')
+
+    figures = []
+    for (scenario, environment), group in avg_response_times.groupby(['Scenario', 'Environment']):
+        for metric in metrics:
+            path = os.path.join(folder_path, f'{scenario.replace("/", "_")}_{environment.replace("/", "_")}_{metric.replace(" ", "_").lower()}_plot_horizontal.png')
+            figures.append((draw_vu_bars, {'path': path, 'scenario': scenario, 'environment': environment, 'metric': metric,
+                                           'group': group[['Architecture', 'VU (Virtual Users)', metric]]}))
+
+    figures += density_figures(results_df, ['Scenario', 'Environment', 'Architecture'], 'VU (Virtual Users)', 'VU',
+                               lambda key: os.path.join(folder_path, '_'.join(value.replace("/", "_") for value in key)), density)
+
+    render_changed_figures(figures, folder_path, jobs, use_cache)
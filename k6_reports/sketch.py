@@ -0,0 +1,85 @@
+import numpy as np
+
+# Default relative error of the quantiles reported by LatencySketch
+SKETCH_RELATIVE_ERROR = 0.01
+
+class LatencySketch:
+    # Mergeable log-bucketed histogram (the DDSketch/HDR histogram idea): a sample v falls in bucket
+    # ceil(log_gamma(v)) and every quantile is reported within relative_error of an actual sample.
+    # The buckets cover MIN_VALUE..MAX_VALUE ms, so the memory used does not depend on the number of samples.
+    MIN_VALUE = 1e-3
+    MAX_VALUE = 1e7
+
+    def __init__(self, relative_error=SKETCH_RELATIVE_ERROR):
+        self.relative_error = relative_error
+        self.gamma = (1 + relative_error) / (1 - relative_error)
+        self.log_gamma = np.log(self.gamma)
+        self.offset = int(np.ceil(np.log(self.MIN_VALUE) / self.log_gamma))
+        self.counts = np.zeros(int(np.ceil(np.log(self.MAX_VALUE) / self.log_gamma)) - self.offset + 1, dtype=np.int64)
+        self.count = 0
+        self.sum = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def bucket_indexes(self, values):
+        return np.ceil(np.log(np.clip(values, self.MIN_VALUE, self.MAX_VALUE)) / self.log_gamma).astype(np.int64) - self.offset
+
+    def bucket_values(self, indexes):
+        # Representative value of each bucket, within relative_error of every sample in it
+        return 2 * self.gamma ** (np.asarray(indexes) + self.offset) / (self.gamma + 1)
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        self.counts += np.bincount(self.bucket_indexes(values), minlength=len(self.counts))
+        self.count += len(values)
+        self.sum += float(np.sum(values))
+        self.min = min(self.min, float(np.min(values)))
+        self.max = max(self.max, float(np.max(values)))
+
+    def merge(self, other):
+        if other.relative_error != self.relative_error:
+            raise ValueError(f"Cannot merge sketches with relative errors {self.relative_error} and {other.relative_error}")
+        self.counts += other.counts
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        if self.count == 0:
+            return np.nan
+        rank = q * (self.count - 1)
+        index = int(np.searchsorted(np.cumsum(self.counts), rank, side='right'))
+        return min(max(float(self.bucket_values(index)), self.min), self.max)
+
+    def mean(self):
+        return self.sum / self.count if self.count else np.nan
+
+    def to_dict(self):
+        # Sparse representation, used for the cache and to send the sketch back from the worker processes
+        indexes = np.flatnonzero(self.counts)
+        return {'relative_error': self.relative_error, 'indexes': indexes.tolist(), 'counts': self.counts[indexes].tolist(),
+                'count': self.count, 'sum': self.sum, 'min': self.min if self.count else None, 'max': self.max if self.count else None}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['relative_error'])
+        sketch.counts[data['indexes']] = data['counts']
+        sketch.count = data['count']
+        sketch.sum = data['sum']
+        if sketch.count:
+            sketch.min = data['min']
+            sketch.max = data['max']
+        return sketch
+
+def merge_sketches(sketch_dicts):
+    sketch_dicts = [data for data in sketch_dicts if data is not None]
+    if not sketch_dicts:
+        return LatencySketch()
+    merged = LatencySketch.from_dict(sketch_dicts[0])
+    for data in sketch_dicts[1:]:
+        merged.merge(LatencySketch.from_dict(data))
+    return merged
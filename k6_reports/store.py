@@ -0,0 +1,161 @@
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+
+from .sketch import LatencySketch
+from .engine import merge_counts, grouped_quantiles
+from .datasets import load_samples
+
+# SQLite results store shared by every scenario folder. Each processed folder (a collection) replaces its own reports,
+# with the statistics of results.xlsx and the sparse latency sketch buckets of every report, so pooled percentiles
+# over any group of reports are computed from the store alone, without the JSON reports.
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY,
+    collection TEXT NOT NULL,
+    scenario TEXT,
+    architecture TEXT,
+    environment TEXT,
+    run TEXT,
+    load_kind TEXT,
+    load INTEGER,
+    file TEXT,
+    request_count INTEGER,
+    min_response_time REAL,
+    max_response_time REAL,
+    mean_response_time REAL,
+    median_response_time REAL,
+    p90_response_time REAL,
+    p99_response_time REAL,
+    http_codes_200 INTEGER,
+    http_codes_fail INTEGER,
+    samples_file TEXT,
+    relative_error REAL
+);
+CREATE INDEX IF NOT EXISTS reports_group ON reports (scenario, architecture, load_kind, load, run);
+CREATE INDEX IF NOT EXISTS reports_collection ON reports (collection);
+CREATE TABLE IF NOT EXISTS latency_buckets (
+    report_id INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (report_id, bucket)
+) WITHOUT ROWID;
+'''
+
+# results.xlsx columns stored for every report
+STORED_COLUMNS = {
+    'File': 'file',
+    'Request Count': 'request_count',
+    'Min Response Time': 'min_response_time',
+    'Max Response Time': 'max_response_time',
+    'Mean Response Time': 'mean_response_time',
+    'Median Response Time': 'median_response_time',
+    'P90 Response Time': 'p90_response_time',
+    'P99 Response Time': 'p99_response_time',
+    'HTTP Codes 200': 'http_codes_200',
+    'HTTP Codes Fail': 'http_codes_fail',
+    'Samples File': 'samples_file',
+}
+
+# Columns the reports can be grouped by. Layouts without a scenario field use the name of the collection folder.
+GROUP_COLUMNS = ['collection', 'scenario', 'architecture', 'environment', 'run', 'load_kind', 'load']
+
+def sql_value(value):
+    # NumPy/pandas scalars are stored as plain Python values and missing values as NULL
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+def group_positions(df, groups_df, group_by):
+    # Position in groups_df of the group of every row of df, NULL keys match each other as in SQL GROUP BY
+    return df[group_by].merge(groups_df[group_by].reset_index(), on=group_by, how='left')['index'].to_numpy()
+
+def connect_store(store_path):
+    connection = sqlite3.connect(store_path)
+    connection.executescript(SCHEMA)
+    return connection
+
+def update_store(store_path, collection_path, results_df, layout):
+    # Replace the reports of the collection (a folder processed by k6-reports) with the rows of results_df
+    collection = os.path.relpath(collection_path, os.path.dirname(os.path.abspath(store_path)))
+    fields = {key: column for key, column, convert in layout['fields']}
+    load_key = layout['fields'][-1][0]
+
+    with connect_store(store_path) as connection:
+        connection.execute('DELETE FROM latency_buckets WHERE report_id IN (SELECT id FROM reports WHERE collection = ?)', (collection,))
+        connection.execute('DELETE FROM reports WHERE collection = ?', (collection,))
+        for index, row in results_df.iterrows():
+            sketch = row['Latency Sketch']
+            values = {
+                'collection': collection,
+                'scenario': row[fields['scenario']] if 'scenario' in fields else os.path.basename(collection_path),
+                'architecture': row[fields['architecture']],
+                'environment': row[fields['environment']] if 'environment' in fields else None,
+                'run': row[fields['run']],
+                'load_kind': load_key,
+                'load': int(row[fields[load_key]]),
+                'relative_error': sketch['relative_error'] if sketch is not None else None,
+                **{name: sql_value(row[column]) for column, name in STORED_COLUMNS.items()},
+            }
+            cursor = connection.execute(f'INSERT INTO reports ({", ".join(values)}) VALUES ({", ".join("?" * len(values))})', list(values.values()))
+            if sketch is not None:
+                connection.executemany('INSERT INTO latency_buckets (report_id, bucket, count) VALUES (?, ?, ?)',
+                                       [(cursor.lastrowid, bucket, count) for bucket, count in zip(sketch['indexes'], sketch['counts'])])
+    connection.close()
+    return collection
+
+def query_store(store_path, group_by, where=None, quantiles=(0.5, 0.9, 0.99), exact=False):
+    # Statistics of the reports grouped by group_by (columns from GROUP_COLUMNS), where is an optional SQL condition.
+    # Pooled percentiles come from the summed sketch buckets of each group, or from the samples files with exact=True.
+    unknown = [column for column in group_by if column not in GROUP_COLUMNS]
+    if unknown:
+        raise ValueError(f"Cannot group by {', '.join(unknown)}, use {', '.join(GROUP_COLUMNS)}")
+    columns = ', '.join(f'r.{column}' for column in group_by)
+    condition = f'WHERE {where}' if where else ''
+
+    with connect_store(store_path) as connection:
+        groups_df = pd.read_sql_query(f'''
+            SELECT {columns}, COUNT(*) AS reports, COUNT(DISTINCT r.run) AS runs, SUM(r.request_count) AS requests,
+                   SUM(r.mean_response_time * r.request_count) / SUM(r.request_count) AS mean_response_time,
+                   AVG(r.p99_response_time) AS average_p99_response_time, MIN(r.min_response_time) AS min_response_time,
+                   MAX(r.max_response_time) AS max_response_time,
+                   CAST(SUM(r.http_codes_fail) AS REAL) / SUM(r.http_codes_200 + r.http_codes_fail) AS failure_rate
+            FROM reports r {condition} GROUP BY {columns} ORDER BY {columns}''', connection)
+        relative_errors = [error for error, in connection.execute(f'SELECT DISTINCT r.relative_error FROM reports r {condition}') if error is not None]
+        reports_df = pd.read_sql_query(f'SELECT r.id, {columns}, r.collection AS samples_collection, r.samples_file FROM reports r {condition}', connection)
+        if not exact:
+            # Raw buckets through the primary key, they are summed per group with NumPy instead of an SQL GROUP BY
+            buckets = np.array(connection.execute(f'SELECT b.report_id, b.bucket, b.count FROM latency_buckets b WHERE b.report_id IN (SELECT r.id FROM reports r {condition})').fetchall(),
+                               dtype=np.int64).reshape(-1, 3)
+    connection.close()
+
+    quantile_columns = [f'pooled_p{q * 100:g}_response_time' for q in quantiles]
+    report_groups = group_positions(reports_df, groups_df, group_by)
+    if exact:
+        # Every samples file is memory-mapped, a group without all its samples files gets no percentiles
+        store_folder = os.path.dirname(os.path.abspath(store_path))
+        pooled = np.full((len(groups_df), len(quantiles)), np.nan)
+        for position, group in reports_df.groupby(report_groups):
+            if group['samples_file'].isna().any():
+                continue
+            samples = np.concatenate([load_samples(os.path.join(store_folder, collection, path)) for collection, path in zip(group['samples_collection'], group['samples_file'])])
+            pooled[position] = np.percentile(samples, [q * 100 for q in quantiles])
+        groups_df[quantile_columns] = pooled
+        return groups_df
+
+    if len(relative_errors) > 1:
+        raise ValueError(f"Reports processed with different sketch errors ({', '.join(map(str, relative_errors))}) cannot be pooled, narrow the query with where")
+    for column in quantile_columns:
+        groups_df[column] = np.nan
+    if relative_errors and len(buckets):
+        sketch = LatencySketch(relative_errors[0])
+        order = np.argsort(reports_df['id'].to_numpy())
+        bucket_groups = report_groups[order][np.searchsorted(reports_df['id'].to_numpy()[order], buckets[:, 0])]
+        keys, counts = merge_counts(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), bucket_groups * len(sketch.counts) + buckets[:, 1], buckets[:, 2])
+        groups = np.unique(bucket_groups)
+        for q, column in zip(quantiles, quantile_columns):
+            # Bucket values are clamped to the exact min/max of the group, as LatencySketch.quantile does
+            values = grouped_quantiles(sketch, keys, counts, groups, q)
+            groups_df.loc[groups, column] = np.clip(values, groups_df['min_response_time'].to_numpy()[groups], groups_df['max_response_time'].to_numpy()[groups])
+    return groups_df
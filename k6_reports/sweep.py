@@ -0,0 +1,123 @@
+import os
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from matplotlib import patheffects
+from matplotlib.colors import LogNorm
+from concurrent.futures import ProcessPoolExecutor
+
+from . import costs
+from .plots import render_figures
+
+# Breakeven RPS of Lambda against EC2 + ALB over a grid of Lambda memory sizes, execution times and instance options,
+# evaluated as ((memory, duration) pair, instance option, RPS segment) arrays with costs.breakeven_crossings.
+
+# Monthly cost of the instance types of the breakeven.py scripts (N.Virginia us-east-1 region)
+INSTANCE_TYPES = {
+    't3.micro': {'reserved': 4.75, 'on-demand': 7.59},
+    't3.small': {'reserved': 9.49, 'on-demand': 15.18},
+    'm5.large': {'reserved': 43.80, 'on-demand': 70.08},
+}
+PRICING = ['reserved', 'on-demand']
+
+# Elements of the (scenario, instance option, segment) arrays of one batch. The (memory, duration) pairs of the grid are
+# split into batches of about this size, each with only the breakpoints of its own pairs, and the batches go to a pool
+# of worker processes when there is more than one
+SWEEP_BATCH_ELEMENTS = 4_000_000
+
+def instance_capacities(instance_options, rps_per_step=None):
+    # RPS served by one scaling step of every instance option, costs.RPS_PER_SCALING_STEP for the types not in rps_per_step
+    return [(rps_per_step or {}).get(instance_type, costs.RPS_PER_SCALING_STEP) for instance_type, pricing, cost in instance_options]
+
+def sweep_batch(memory_mb, execution_times_ms, instance_costs, capacities, max_rps, instances=None):
+    # First and last breakeven RPS, number of crossings and RPS intervals where Lambda is cheaper (as text) of every
+    # (memory, duration) pair against every instance option as (pairs, instance options) arrays, NaN where the cheaper
+    # option never changes up to max_rps. Extra breakpoints only split a straight segment in two, so the breakpoints of
+    # all the pairs are used together. capacities are the RPS served by one scaling step of every instance option.
+    memory_mb = np.asarray(memory_mb, dtype=np.float64)[:, np.newaxis, np.newaxis]
+    execution_times_ms = np.asarray(execution_times_ms, dtype=np.float64)[:, np.newaxis, np.newaxis]
+    instance_costs = np.asarray(instance_costs, dtype=np.float64)[np.newaxis, :, np.newaxis]
+    capacities = np.asarray(capacities, dtype=np.float64)[np.newaxis, :, np.newaxis]
+    breakpoints = [costs.lambda_breakpoints(memory_mb, execution_times_ms), costs.alb_breakpoints()]
+    if instances is None:
+        breakpoints.extend(costs.instance_breakpoints(max_rps, capacity) for capacity in np.unique(capacities))
+    crossings, cheaper_at_low = costs.breakeven_crossings(lambda rps: costs.lambda_cost(rps, memory_mb, execution_times_ms),
+                                             lambda rps: costs.ec2_ha_cost(rps, instance_costs, costs.instance_count(rps, capacities) if instances is None else instances),
+                                             np.concatenate(breakpoints), 0, max_rps)
+    found = ~np.isnan(crossings)
+    count = found.sum(axis=-1)
+    first = np.where(found, crossings, np.inf).min(axis=-1)
+    last = np.where(found, crossings, -np.inf).max(axis=-1)
+    cheaper_at_low = np.broadcast_to(cheaper_at_low, count.shape)
+    intervals = np.empty(count.shape, dtype=object)
+    for index in np.ndindex(count.shape):
+        intervals[index] = ', '.join(f'{start:.2f}-{end:.2f}' for start, end in
+                                     costs.cheaper_intervals(crossings[index], cheaper_at_low[index], 0, max_rps)) or 'never'
+    return np.where(count > 0, first, np.nan), np.where(count > 0, last, np.nan), count, intervals
+
+def sweep_breakevens(memory_mb, execution_times_ms, instance_options, max_rps, instances=None, jobs=1, rps_per_step=None):
+    # (memory, duration, instance option) arrays of sweep_batch for the whole grid. instance_options is a list of
+    # (instance type, pricing, monthly cost), rps_per_step maps instance types to the RPS served by one scaling step
+    # of them as in traffic.simulation_table.
+    instance_costs = [cost for instance_type, pricing, cost in instance_options]
+    capacities = instance_capacities(instance_options, rps_per_step)
+    memory, duration = [values.ravel() for values in np.meshgrid(memory_mb, execution_times_ms, indexing='ij')]
+    steps = sum(max_rps / capacity for capacity in set(capacities)) if instances is None else 0
+    # Largest batch of pairs whose pairs * options * (2 * pairs + steps) arrays fit in SWEEP_BATCH_ELEMENTS
+    options = len(instance_costs)
+    batch_size = max(1, int((np.sqrt((options * steps) ** 2 + 8 * options * SWEEP_BATCH_ELEMENTS) - options * steps) / (4 * options)))
+    arguments = [(memory[start:start + batch_size], duration[start:start + batch_size], instance_costs, capacities, max_rps, instances) for start in range(0, len(memory), batch_size)]
+    if jobs == 1 or len(arguments) == 1:
+        results = [sweep_batch(*batch_arguments) for batch_arguments in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(arguments))) as executor:
+            results = list(executor.map(sweep_batch, *zip(*arguments)))
+    shape = (len(memory_mb), len(execution_times_ms), options)
+    return [np.concatenate(arrays).reshape(shape) for arrays in zip(*results)]
+
+def sweep_table(memory_mb, execution_times_ms, instance_options, first, last, count, intervals, rps_per_step=None):
+    capacities = instance_capacities(instance_options, rps_per_step)
+    memory, duration, option = np.meshgrid(np.arange(len(memory_mb)), np.arange(len(execution_times_ms)), np.arange(len(instance_options)), indexing='ij')
+    return pd.DataFrame({
+        'Memory (MB)': np.asarray(memory_mb)[memory.ravel()],
+        'Execution Time (ms)': np.asarray(execution_times_ms)[duration.ravel()],
+        'Instance Type': [instance_options[index][0] for index in option.ravel()],
+        'Pricing': [instance_options[index][1] for index in option.ravel()],
+        'Instance Monthly Cost': [instance_options[index][2] for index in option.ravel()],
+        'RPS per Scaling Step': [capacities[index] for index in option.ravel()],
+        'Break-even RPS': first.ravel(),
+        'Last Break-even RPS': last.ravel(),
+        'Crossings': count.ravel(),
+        'Lambda Cheaper RPS': intervals.ravel(),
+    })
+
+def draw_breakeven_heatmap(path, title, memory_mb, execution_times_ms, breakevens, max_rps):
+    # Memory x duration heatmap of the first breakeven RPS of one instance option, gray where Lambda stays cheaper up to max_rps
+    fig, ax = plt.subplots(figsize=(12, 8))
+    image = ax.imshow(np.ma.masked_invalid(breakevens), aspect='auto', origin='lower', cmap='viridis', interpolation='nearest',
+                      norm=LogNorm() if np.isfinite(breakevens).any() else None)
+    ax.set_facecolor('lightgray')
+    fig.colorbar(image, ax=ax, label='Break-even RPS')
+    ax.set_xticks(np.arange(len(execution_times_ms)), [f'{value:g}' for value in execution_times_ms], rotation=90 if len(execution_times_ms) > 20 else 0)
+    ax.set_yticks(np.arange(len(memory_mb)), [f'{value:g}' for value in memory_mb])
+    if breakevens.size <= 400:
+        for (row, column), value in np.ndenumerate(breakevens):
+            ax.text(column, row, f'{value:.0f}' if np.isfinite(value) else f'>{max_rps:g}', ha='center', va='center', fontsize=8, color='white',
+                    path_effects=[patheffects.withStroke(linewidth=2, foreground='black')])
+    ax.set_title(title)
+    ax.set_xlabel('Lambda Execution Time (ms)')
+    ax.set_ylabel('Lambda Memory (MB)')
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+def plot_sweep(folder_path, memory_mb, execution_times_ms, instance_options, first, max_rps, jobs=1, rps_per_step=None):
+    figures = []
+    capacities = instance_capacities(instance_options, rps_per_step)
+    for index, (instance_type, pricing, cost) in enumerate(instance_options):
+        figures.append((draw_breakeven_heatmap, {
+            'path': os.path.join(folder_path, f'breakeven_sweep_{instance_type}_{pricing}.png'),
+            'title': f'Lambda vs EC2 HA {instance_type} {pricing} (${cost:.2f}/month, {capacities[index]:g} RPS/step) Break-even RPS',
+            'memory_mb': memory_mb, 'execution_times_ms': execution_times_ms, 'breakevens': first[:, :, index], 'max_rps': max_rps,
+        }))
+    render_figures(figures, jobs)
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from . import costs
+from .datasets import load_frame
+
+# Monthly cost of a load that changes over time, simulated second by second over the whole month as NumPy arrays.
+# Lambda is billed on the requests and GB-seconds of the month, EC2 on the instances running every second while the
+# instance_count rules follow the load, and the ALB on the LCUs of every hour.
+
+# EC2 autoscaling: new instances are launched as soon as instance_count asks for them and take traffic after
+# SCALE_OUT_DELAY_SECONDS (boot + health checks), and instances are only terminated once the load has asked for fewer
+# of them during SCALE_IN_COOLDOWN_SECONDS
+SCALE_OUT_DELAY_SECONDS = 180
+SCALE_IN_COOLDOWN_SECONDS = 300
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+def diurnal_profile(peak_rps, trough_rps, peak_hour=14, seconds=costs.SECONDS_IN_MONTH):
+    # RPS of every second following a daily cosine between trough_rps at night and peak_rps at peak_hour
+    phase = 2 * np.pi * (np.arange(seconds) / SECONDS_PER_DAY - peak_hour / 24)
+    return trough_rps + (peak_rps - trough_rps) * (1 + np.cos(phase)) / 2
+
+def add_bursts(rps, burst_rps, burst_seconds, bursts_per_day, seed=0):
+    # Extra burst_rps during burst_seconds, bursts_per_day times a day at random times
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, len(rps), int(round(bursts_per_day * len(rps) / SECONDS_PER_DAY)))
+    active = np.zeros(len(rps) + 1, dtype=np.int64)
+    np.add.at(active, starts, 1)
+    np.add.at(active, np.minimum(starts + burst_seconds, len(rps)), -1)
+    return rps + burst_rps * (np.cumsum(active[:-1]) > 0)
+
+def series_profile(rps_values, step_seconds, seconds=costs.SECONDS_IN_MONTH):
+    # RPS of every second of a series with one value every step_seconds (3600 hourly, 60 minutely), repeated until
+    # the month is filled
+    per_second = np.repeat(np.asarray(rps_values, dtype=np.float64), int(step_seconds))
+    return np.resize(per_second, seconds)
+
+def timeline_profile(timeline_path, scale=1.0, window_seconds=None, seconds=costs.SECONDS_IN_MONTH):
+    # RPS of every second from the requests of a k6 timeline (k6-reports --timeline), windows without requests
+    # included, scaled and repeated until the month is filled. The timeline only has the windows with requests, whose
+    # Achieved RPS is Requests / window_seconds, so the window length is read from them unless it is given. The
+    # requests are resampled to 1 s by interpolating the cumulative requests at the window edges, so windows shorter
+    # or longer than a second keep the duration and the requests of the run
+    timeline_df = load_frame(timeline_path)
+    timeline_df = timeline_df[timeline_df['Requests'] > 0]
+    if timeline_df.empty:
+        raise ValueError(f"{timeline_path} has no requests")
+    if window_seconds is None:
+        window_seconds = float(np.median(timeline_df['Requests'] / timeline_df['Achieved RPS']))
+    positions = np.round(timeline_df['Elapsed Seconds'].to_numpy() / window_seconds).astype(np.int64)
+    requests = np.zeros(positions[-1] + 1)
+    requests[positions] = timeline_df['Requests'].to_numpy() * scale
+    edges = np.arange(len(requests) + 1) * window_seconds
+    cumulative = np.concatenate([[0.0], np.cumsum(requests)])
+    per_second = np.diff(np.interp(np.arange(np.ceil(edges[-1]) + 1), edges, cumulative))
+    return series_profile(per_second, 1, seconds)
+
+def rolling_max(values, window):
+    # Maximum of every trailing window of values (van Herk/Gil-Werman): within blocks of window elements, every
+    # trailing window is the suffix maximum of one block and the prefix maximum of the next
+    if window <= 1:
+        return np.asarray(values)
+    padded = np.concatenate([np.full(window - 1, values[0]), values])
+    padded = np.concatenate([padded, np.full(-len(padded) % window, values[-1])])
+    blocks = padded.reshape(-1, window)
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    ends = np.arange(len(values)) + window - 1
+    return np.maximum(suffix[ends - window + 1], prefix[ends])
+
+def autoscaled_instances(rps, scale_out_delay=SCALE_OUT_DELAY_SECONDS, scale_in_cooldown=SCALE_IN_COOLDOWN_SECONDS, rps_per_step=costs.RPS_PER_SCALING_STEP,
+                         instances_per_step=costs.INSTANCES_PER_SCALING_STEP, min_instances=costs.MIN_INSTANCES):
+    # Instances asked for, running (billed) and serving traffic every second. An instance runs from the second it is
+    # asked for until the load has asked for fewer instances for scale_in_cooldown seconds, and serves once it has been
+    # running for scale_out_delay seconds.
+    desired = costs.instance_count(rps, rps_per_step, instances_per_step, min_instances)
+    running = rolling_max(desired, scale_in_cooldown + 1)
+    serving = -rolling_max(-running, scale_out_delay + 1)
+    return desired, running, serving
+
+def simulate_month(rps, memory_mb, execution_time_ms, instance_monthly_cost, scale_out_delay=SCALE_OUT_DELAY_SECONDS, scale_in_cooldown=SCALE_IN_COOLDOWN_SECONDS,
+                   rps_per_step=costs.RPS_PER_SCALING_STEP, instances_per_step=costs.INSTANCES_PER_SCALING_STEP, min_instances=costs.MIN_INSTANCES, instances=None):
+    # Monthly Lambda and autoscaled EC2 HA + ALB cost of a per-second RPS profile, next to the cost of its mean RPS
+    # as a constant load, with the instance arrays of the simulation (instances reuses the autoscaled_instances arrays
+    # of the same profile and scaling rules)
+    rps = np.asarray(rps, dtype=np.float64)
+    requests = rps.sum()
+    gb_seconds = requests * execution_time_ms / 1000 * memory_mb / 1024
+    lambda_monthly_cost = float(costs.lambda_compute_cost(gb_seconds) + costs.lambda_request_cost(requests))
+
+    if instances is None:
+        instances = autoscaled_instances(rps, scale_out_delay, scale_in_cooldown, rps_per_step, instances_per_step, min_instances)
+    desired, running, serving = instances
+    ec2_monthly_cost = float(instance_monthly_cost * running.sum() / costs.SECONDS_IN_MONTH)
+    capacity_rps = serving / instances_per_step * rps_per_step
+
+    # LCUs are billed every hour on the new connections per second of that hour
+    hourly_rps = np.resize(rps, -(-len(rps) // 3600) * 3600).reshape(-1, 3600).mean(axis=1)
+    alb_monthly_cost = float(costs.alb_lcus(new_connections_per_second=hourly_rps).sum() * costs.LCU_COST_PER_HOUR + costs.ALB_FIXED_MONTHLY_COST)
+
+    mean_rps = requests / len(rps)
+    result = {
+        'Mean RPS': mean_rps,
+        'Peak RPS': float(rps.max()),
+        'Requests': requests,
+        'Lambda Monthly Cost': lambda_monthly_cost,
+        'EC2 Mean Instances': float(running.mean()),
+        'EC2 Peak Instances': int(running.max()),
+        'EC2 Monthly Cost': ec2_monthly_cost,
+        'ALB Monthly Cost': alb_monthly_cost,
+        'EC2 HA Monthly Cost': ec2_monthly_cost + alb_monthly_cost,
+        'Under-provisioned Seconds': int((serving < desired).sum()),
+        'Requests above Capacity': float(np.maximum(rps - capacity_rps, 0).sum()),
+        'Lambda Monthly Cost (Constant Mean RPS)': float(costs.lambda_cost(mean_rps, memory_mb, execution_time_ms)),
+        'EC2 HA Monthly Cost (Constant Mean RPS)': float(costs.ec2_ha_cost(mean_rps, instance_monthly_cost, costs.instance_count(mean_rps, rps_per_step, instances_per_step, min_instances))),
+    }
+    return result, (desired, running, serving)
+
+def draw_traffic_simulation(path, title, rps, desired, running, serving, seconds=7 * SECONDS_PER_DAY):
+    # Load and instances of the first seconds of the simulation (a week by default), with the maximum of every minute
+    minutes = np.arange(0, min(seconds, len(rps)), 60)
+    rps, desired, running, serving = (np.maximum.reduceat(values[:minutes[-1] + 60], minutes) for values in (rps, desired, running, serving))
+    fig, (ax_rps, ax_instances) = plt.subplots(2, 1, figsize=(16, 10), sharex=True)
+    hours = minutes / 3600
+    ax_rps.plot(hours, rps, color='orange', linewidth=0.8)
+    ax_rps.set_ylabel('Requests per Second (RPS)')
+    ax_rps.grid(True)
+    ax_instances.step(hours, running, where='post', label='Running (billed)', color='purple')
+    ax_instances.step(hours, serving, where='post', label='Serving', color='blue', linestyle=':')
+    ax_instances.step(hours, desired, where='post', label='Asked by instance_count', color='gray', linewidth=0.6)
+    ax_instances.set_ylabel('EC2 Instances')
+    ax_instances.set_xlabel('Hours')
+    ax_instances.grid(True)
+    ax_instances.legend()
+    fig.suptitle(title)
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+def simulation_table(rps, memory_mb, execution_time_ms, instance_options, rps_per_step=None, **scaling):
+    # One simulate_month row per (instance type, pricing, monthly cost) option, with the instance arrays of every
+    # capacity. rps_per_step maps instance types to the RPS served by one scaling step of them, the other types use
+    # costs.RPS_PER_SCALING_STEP. The instances only depend on the load, the capacity and the scaling rules, so the
+    # options with the same capacity share one simulation.
+    rows = []
+    simulations = {}
+    for instance_type, pricing, cost in instance_options:
+        capacity = (rps_per_step or {}).get(instance_type, costs.RPS_PER_SCALING_STEP)
+        if capacity not in simulations:
+            simulations[capacity] = autoscaled_instances(rps, rps_per_step=capacity, **scaling)
+        result, _ = simulate_month(rps, memory_mb, execution_time_ms, cost, rps_per_step=capacity, instances=simulations[capacity], **scaling)
+        rows.append({'Instance Type': instance_type, 'Pricing': pricing, 'Instance Monthly Cost': cost, 'RPS per Scaling Step': capacity, **result})
+    return pd.DataFrame(rows), simulations